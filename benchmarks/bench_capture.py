@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark microphone capture latency
+Simulates PortAudio's callback thread delivering frames in real time into
+capture.AudioCapture and measures how long the event loop of
+sources.captured_audio() takes to wake up with each frame, plus the
+end-to-end delay before a sample can leave the machine (frame duration +
+wake-up), against the old 240 ms blocking reads.
+"""
+import asyncio
+import statistics
+import threading
+import time
+
+from soniox_transcriber.capture import AudioCapture
+from soniox_transcriber.sources import captured_audio
+
+RATE = 16000
+FRAME_MS = [10, 20, 40]
+OLD_CHUNK_MS = 240  # CHUNK_SIZE = 3840 samples at 16 kHz
+SECONDS = 5  # Real-time audio per measurement
+
+
+def start_producer(capture: AudioCapture, frames: int, sent_at: list) -> threading.Thread:
+    """Deliver frames in real time the way AudioCapture's PortAudio callback does."""
+    frame = bytes(capture.frame_bytes)
+
+    def callback_thread():
+        start = time.perf_counter()
+        for i in range(frames):
+            delay = start + (i + 1) * capture.frame_ms / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            sent_at.append(time.perf_counter())
+            capture.ring.write(frame)
+            capture.on_data()
+
+    producer = threading.Thread(target=callback_thread)
+    producer.start()
+    return producer
+
+
+async def measure_loop(capture: AudioCapture, frames: int) -> list:
+    sent_at: list = []
+    wakeups = []
+    received = 0
+    audio = captured_audio(capture)
+    producer = None
+    async for data in audio:
+        if producer is None:
+            producer = start_producer(capture, frames, sent_at)  # Once on_data is hooked up
+            continue
+        now = time.perf_counter()
+        received += len(data)
+        wakeups.append(now - sent_at[received // capture.frame_bytes - 1])  # Newest frame in this read
+        if received >= frames * capture.frame_bytes:
+            break
+    await audio.aclose()
+    producer.join()
+    return wakeups
+
+
+def report(frame_ms: int, capture: AudioCapture, wakeups: list):
+    wakeups_us = sorted(w * 1e6 for w in wakeups)
+    p50 = statistics.median(wakeups_us)
+    p99 = wakeups_us[int(len(wakeups_us) * 0.99) - 1]
+    print(f"{frame_ms:>6}ms {len(wakeups):>6} {p50:>10.0f} {p99:>10.0f} "
+          f"{frame_ms + p50 / 1000:>12.1f} {capture.overflows:>9}")
+
+
+def main():
+    print(f"{'frame':>8} {'reads':>6} {'wake p50µs':>10} {'wake p99µs':>10} "
+          f"{'delay ms':>12} {'overflows':>9}")
+    print("-" * 62)
+    for frame_ms in FRAME_MS:
+        frames = SECONDS * 1000 // frame_ms
+        capture = AudioCapture(rate=RATE, frame_ms=frame_ms)
+        capture.ring.write(bytes(capture.frame_bytes))  # Primes the first iteration
+        report(frame_ms, capture, asyncio.run(measure_loop(capture, frames)))
+    print(f"\nBefore: blocking {OLD_CHUNK_MS} ms reads, so a sample waited up to {OLD_CHUNK_MS} ms "
+          f"before it could be sent")
+
+
+if __name__ == "__main__":
+    main()
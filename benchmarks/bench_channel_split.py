@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark stereo channel splitting for the Vapi server
+Measures CPU time per frame of ChannelSplitter.split() across frame sizes,
+against a naive per-sample Python loop for reference.
+"""
+import os
+import sys
+import time
+
+from soniox_transcriber.audio import ChannelSplitter
+
+SAMPLE_RATES = [8000, 16000, 48000]
+FRAME_MS = [10, 20, 40, 100, 250]
+TARGET_SECONDS = 0.2  # Wall time spent per measurement
+
+
+def naive_split(frame: bytes):
+    """Per-sample reference implementation."""
+    left = bytearray()
+    right = bytearray()
+    for i in range(0, len(frame) - 3, 4):
+        left += frame[i:i + 2]
+        right += frame[i + 2:i + 4]
+    return [bytes(left), bytes(right)]
+
+
+def time_per_call(fn, frame: bytes) -> float:
+    """Return average CPU seconds per call of fn(frame)."""
+    iterations = 0
+    start = time.process_time()
+    deadline = time.perf_counter() + TARGET_SECONDS
+    while time.perf_counter() < deadline:
+        fn(frame)
+        iterations += 1
+    return (time.process_time() - start) / iterations
+
+
+def main():
+    print(f"{'rate':>6} {'frame':>6} {'bytes':>7} {'split µs':>10} {'naive µs':>10} {'speedup':>8} {'CPU %/stream':>13}")
+    print("-" * 66)
+
+    for rate in SAMPLE_RATES:
+        for frame_ms in FRAME_MS:
+            frame = os.urandom(rate * frame_ms // 1000 * 4)  # Stereo, 16-bit
+            splitter = ChannelSplitter(channels=2)
+
+            split_s = time_per_call(splitter.split, frame)
+            naive_s = time_per_call(naive_split, frame)
+
+            # Share of one core a single real-time stereo stream spends splitting
+            cpu_share = split_s / (frame_ms / 1000) * 100
+
+            print(f"{rate:>6} {frame_ms:>4}ms {len(frame):>7} {split_s * 1e6:>10.2f} "
+                  f"{naive_s * 1e6:>10.1f} {naive_s / split_s:>7.0f}x {cpu_share:>12.4f}%")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
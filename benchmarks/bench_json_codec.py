@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark Soniox response parsing
+Measures CPU time to decode a response and collect its final token text, the
+work done per message in process_soniox_responses(), for each installed
+codec backend against plain json.loads + dict access.
+"""
+import importlib
+import json
+import os
+import time
+
+from soniox_transcriber import codec
+
+TOKEN_COUNTS = [1, 10, 50, 200]
+TARGET_SECONDS = 0.2  # Wall time spent per measurement
+
+
+def make_response(token_count: int) -> str:
+    """A realistic Soniox response with mixed final and non-final tokens."""
+    tokens = []
+    for i in range(token_count):
+        tokens.append({
+            "text": " word" if i % 7 else "<end>",
+            "start_ms": i * 120,
+            "end_ms": i * 120 + 100,
+            "confidence": 0.97,
+            "is_final": i < token_count * 3 // 4,
+            "speaker": str(i % 2 + 1),
+            "language": "en",
+        })
+    return json.dumps({"tokens": tokens, "final_audio_proc_ms": 1200, "total_audio_proc_ms": 1500})
+
+
+def dict_final_text(message: str) -> str:
+    """The original parsing code: json.loads and dict lookups."""
+    res = json.loads(message)
+    return "".join(t["text"] for t in res.get("tokens", []) if t.get("is_final") and t.get("text"))
+
+
+def codec_final_text(message: str) -> str:
+    res = codec.decode_response(message)
+    return "".join(t.text for t in res.tokens if t.is_final and t.text)
+
+
+def time_per_call(fn, message: str) -> float:
+    """Return average CPU seconds per call of fn(message)."""
+    iterations = 0
+    start = time.process_time()
+    deadline = time.perf_counter() + TARGET_SECONDS
+    while time.perf_counter() < deadline:
+        fn(message)
+        iterations += 1
+    return (time.process_time() - start) / iterations
+
+
+def available_backends():
+    backends = ["json"]
+    for name in ("orjson", "msgspec"):
+        try:
+            importlib.import_module(name)
+            backends.append(name)
+        except ImportError:
+            pass
+    return backends
+
+
+def main():
+    global codec
+
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)}\n")
+    header = f"{'tokens':>6} {'bytes':>7} {'dict µs':>9}"
+    for name in backends:
+        header += f" {name + ' µs':>11}"
+    print(header + f" {'best speedup':>13}")
+
+    for count in TOKEN_COUNTS:
+        message = make_response(count)
+        baseline = time_per_call(dict_final_text, message)
+        row = f"{count:>6} {len(message):>7} {baseline * 1e6:>9.1f}"
+
+        best = baseline
+        for name in backends:
+            os.environ["SONIOX_JSON_CODEC"] = name
+            codec = importlib.reload(codec)
+            assert codec_final_text(message) == dict_final_text(message)
+            elapsed = time_per_call(codec_final_text, message)
+            best = min(best, elapsed)
+            row += f" {elapsed * 1e6:>11.1f}"
+
+        print(row + f" {baseline / best:>12.1f}x")
+
+    os.environ.pop("SONIOX_JSON_CODEC", None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark console transcript rendering
+Replays a synthetic hour-long token stream (about 8 responses per second,
+~3 finalized tokens per second, speaker turns every ~20 s) and measures the
+cost of one update at several points into the session, rendering the full
+token list each time (render_tokens) versus TranscriptRenderer. Also reports
+the total rendering time of the whole hour with TranscriptRenderer, and the
+terminal output of ten minutes: reprinting the transcript on every response
+versus TerminalDisplay at a few refresh rates.
+"""
+import io
+import random
+import time
+
+from soniox_transcriber.codec import Token
+from soniox_transcriber.render import TerminalDisplay, TranscriptRenderer, render_from
+
+RESPONSES_PER_SECOND = 8
+FINAL_TOKENS_PER_SECOND = 3.3
+NON_FINAL_TOKENS = 4
+TURN_SECONDS = 20
+CHECKPOINT_MINUTES = [1, 10, 30, 60]
+DISPLAY_FPS = [0, 15, 5]
+REPEATS = 20  # Updates timed per checkpoint
+
+
+def make_token(rng: random.Random, second: float, is_final: bool) -> Token:
+    speaker = str(int(second // TURN_SECONDS) % 2 + 1)
+    return Token(text=" " + "".join(rng.choices("abcdefghij", k=rng.randint(2, 8))),
+                 is_final=is_final, speaker=speaker, language="en")
+
+
+def responses(minutes: int):
+    """Yield (new final tokens, non-final tokens) per response."""
+    rng = random.Random(0)
+    finals_due = 0.0
+    for i in range(minutes * 60 * RESPONSES_PER_SECOND):
+        second = i / RESPONSES_PER_SECOND
+        finals_due += FINAL_TOKENS_PER_SECOND / RESPONSES_PER_SECOND
+        final = [make_token(rng, second, True) for _ in range(int(finals_due))]
+        finals_due -= int(finals_due)
+        non_final = [make_token(rng, second, False) for _ in range(NON_FINAL_TOKENS)]
+        yield final, non_final
+
+
+def full_render(final_tokens, non_final_tokens) -> str:
+    """What the transcriber did per response before: render everything."""
+    text, _ = render_from(final_tokens + non_final_tokens)
+    return text
+
+
+class Terminal(io.StringIO):
+    """Counts what would be written to a terminal."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.chars = 0
+
+    def isatty(self):
+        return True
+
+    def write(self, text):
+        self.writes += 1
+        self.chars += len(text)
+        return len(text)
+
+
+def bench_display(minutes: int):
+    print(f"\n{'terminal output, ' + str(minutes) + ' min':<26} {'writes':>8} {'MB':>10}")
+    print("-" * 46)
+
+    final_tokens = []
+    writes = chars = 0
+    for final, non_final in responses(minutes):
+        final_tokens.extend(final)
+        if final_tokens or non_final:
+            # Clear the line, then print the whole transcript
+            writes += 2
+            chars += 82 + len(render_from(final_tokens + non_final)[0])
+    print(f"{'reprint every response':<26} {writes:>8} {chars / 1e6:>10.1f}")
+
+    for fps in DISPLAY_FPS:
+        clock = [0.0]
+        terminal = Terminal()
+        display = TerminalDisplay(terminal, max_fps=fps, clock=lambda: clock[0])
+        renderer = TranscriptRenderer()
+        for final, non_final in responses(minutes):
+            clock[0] += 1 / RESPONSES_PER_SECOND
+            if display.timeout() == 0:
+                display.flush()  # What the receive loop's timeout does
+            display.update(renderer.update(final, non_final), renderer.tail)
+        display.close()
+        label = f"TerminalDisplay {fps:g} fps" if fps else "TerminalDisplay unlimited"
+        print(f"{label:<26} {terminal.writes:>8} {terminal.chars / 1e6:>10.3f}")
+
+
+def main():
+    print(f"{'minute':>6} {'final tokens':>12} {'full µs':>10} {'incremental µs':>15} {'speedup':>8}")
+    print("-" * 56)
+
+    checkpoints = {m * 60 * RESPONSES_PER_SECOND: m for m in CHECKPOINT_MINUTES}
+    final_tokens = []
+    renderer = TranscriptRenderer()
+    incremental_total = 0.0
+
+    for index, (final, non_final) in enumerate(responses(max(CHECKPOINT_MINUTES)), start=1):
+        started = time.perf_counter()
+        renderer.update(final, non_final)
+        renderer.text
+        incremental_total += time.perf_counter() - started
+        final_tokens.extend(final)
+
+        minute = checkpoints.get(index)
+        if minute is None:
+            continue
+
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            expected = full_render(final_tokens, non_final)
+        full = (time.perf_counter() - started) / REPEATS
+
+        probe = TranscriptRenderer()
+        probe.update(final_tokens, [])
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            probe.update([], non_final)
+            text = probe.text
+        incremental = (time.perf_counter() - started) / REPEATS
+        assert text == expected
+
+        print(f"{minute:>6} {len(final_tokens):>12} {full * 1e6:>10.1f} {incremental * 1e6:>15.1f} "
+              f"{full / incremental:>7.0f}x")
+
+    updates = max(CHECKPOINT_MINUTES) * 60 * RESPONSES_PER_SECOND
+    print(f"\nWhole hour with TranscriptRenderer: {updates} updates in {incremental_total:.2f}s "
+          f"({incremental_total / updates * 1e6:.1f} µs per update)")
+
+    bench_display(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark audio conversion before forwarding to Soniox
+For common Vapi formats, measures the CPU time to resample/downmix one packet
+with resample.AudioConverter, the resulting CPU share of one core per stream,
+the filter delay added, and how much upstream bandwidth is saved.
+"""
+import time
+
+import numpy as np
+
+from soniox_transcriber.audio import SAMPLE_WIDTH
+from soniox_transcriber.resample import AudioConverter
+
+# (input rate, input channels, output rate, downmix)
+CONVERSIONS = [
+    (48000, 2, 16000, True),
+    (48000, 2, 48000, True),
+    (44100, 2, 16000, True),
+    (24000, 1, 16000, False),
+    (16000, 2, 16000, True),
+]
+PACKET_MS = [20, 40, 100]
+AUDIO_SECONDS = 20  # Audio converted per measurement
+
+
+def make_audio(rate: int, channels: int) -> bytes:
+    """Speech-band noise, different per channel."""
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 3000, size=rate * AUDIO_SECONDS * channels)
+    return np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+
+
+def main():
+    print(f"{'conversion':<24} {'packet':>6} {'µs/packet':>10} {'CPU %':>7} {'delay ms':>9} {'bytes out':>10}")
+    print("-" * 70)
+    for input_rate, channels, output_rate, downmix in CONVERSIONS:
+        audio = make_audio(input_rate, channels)
+        out_channels = 1 if downmix else channels
+        name = f"{input_rate / 1000:g}k x{channels} -> {output_rate / 1000:g}k x{out_channels}"
+
+        for packet_ms in PACKET_MS:
+            packet_bytes = input_rate * channels * SAMPLE_WIDTH * packet_ms // 1000
+            converter = AudioConverter(input_rate, channels, output_rate, downmix)
+            converter.convert(audio[:packet_bytes])  # Warm up
+
+            converted = 0
+            start = time.process_time()
+            for offset in range(0, len(audio), packet_bytes):
+                converted += len(converter.convert(audio[offset:offset + packet_bytes]))
+            elapsed = time.process_time() - start
+
+            packets = -(-len(audio) // packet_bytes)
+            print(f"{name:<24} {packet_ms:>4}ms {elapsed / packets * 1e6:>10.1f} "
+                  f"{elapsed / AUDIO_SECONDS * 100:>7.3f} {converter.delay_ms:>9.2f} "
+                  f"{converted / len(audio):>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the Vapi server
+Runs create_app() in a child process against a local Soniox stub and ramps up
+simulated Vapi calls streaming stereo PCM at real-time pace. For every step it
+reports transcript latency percentiles, server CPU and RSS, and lost audio.
+
+The stub emits one word per --token-ms of audio, named after the audio
+position it ends at, and an <end> marker every --words-per-utterance words.
+Latency is the time from sending the frame that completes an utterance's last
+word to receiving its transcript.
+
+    python benchmarks/bench_vapi_load.py --clients 1,10,25,50 --duration 20
+    python benchmarks/bench_vapi_load.py --audio call.wav --json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import wave
+from typing import Dict, List, Optional
+
+import aiohttp
+from websockets.asyncio.server import serve
+
+SAMPLE_WIDTH = 2
+
+
+# ---------------------------------------------------------------------------
+# Soniox stub
+
+
+class SonioxStub:
+    """Local stand-in for the Soniox real-time WebSocket API."""
+
+    def __init__(self, token_ms: int, latency_ms: int, words_per_utterance: int):
+        self.token_ms = token_ms
+        self.latency = latency_ms / 1000
+        self.words_per_utterance = words_per_utterance
+        self.bytes_received = 0
+        self.connections = 0
+
+    async def handler(self, ws):
+        try:
+            config = json.loads(await ws.recv())
+        except Exception:
+            return  # Pooled connection closed before use
+        self.connections += 1
+        bytes_per_ms = config["sample_rate"] * config["num_channels"] * SAMPLE_WIDTH / 1000
+
+        outbox: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send_delayed(ws, outbox))
+        received = 0
+        words = 0
+        try:
+            async for message in ws:
+                if isinstance(message, str):
+                    if message == "":
+                        outbox.put_nowait((time.monotonic() + self.latency, {"tokens": [], "finished": True}))
+                        break
+                    continue
+
+                before = int(received / bytes_per_ms) // self.token_ms
+                received += len(message)
+                self.bytes_received += len(message)
+                tokens = []
+                for k in range(before + 1, int(received / bytes_per_ms) // self.token_ms + 1):
+                    end_ms = k * self.token_ms
+                    tokens.append({"text": f" w{end_ms}", "start_ms": end_ms - self.token_ms, "end_ms": end_ms,
+                                   "is_final": True, "speaker": "1"})
+                    words += 1
+                    if words % self.words_per_utterance == 0:
+                        tokens.append({"text": "<end>", "is_final": True})
+                if tokens:
+                    outbox.put_nowait((time.monotonic() + self.latency, {"tokens": tokens}))
+        finally:
+            await outbox.put(None)
+            await sender
+
+    @staticmethod
+    async def _send_delayed(ws, outbox: asyncio.Queue):
+        while True:
+            item = await outbox.get()
+            if item is None:
+                return
+            due, response = item
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await ws.send(json.dumps(response))
+            except Exception:
+                return
+
+
+# ---------------------------------------------------------------------------
+# Server under test (child process)
+
+
+def run_server(port: int, soniox_url: str, env: Dict[str, str]):
+    os.environ.update(env)
+    import soniox_transcriber.vapi_server as vapi_server
+    from soniox_transcriber.lifecycle import run_app
+
+    vapi_server.SONIOX_WEBSOCKET_URL = soniox_url
+    vapi_server.setup_logging()
+    # Same serving and SIGTERM drain as soniox-vapi-server
+    run_app(vapi_server.create_app(), host="127.0.0.1", port=port, drain=vapi_server.drain_sessions)
+
+
+class ProcessStats:
+    """CPU time and RSS of a process, read from /proc (Linux) or psutil."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        try:
+            import psutil
+            self._process = psutil.Process(pid)
+        except ImportError:
+            self._process = None
+
+    def cpu_seconds(self) -> Optional[float]:
+        if self._process is not None:
+            times = self._process.cpu_times()
+            return times.user + times.system
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except OSError:
+            return None
+
+    def rss_mb(self) -> Optional[float]:
+        if self._process is not None:
+            return self._process.memory_info().rss / 1e6
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1000
+        except OSError:
+            pass
+        return None
+
+
+async def scrape_metrics(http: aiohttp.ClientSession, base_url: str) -> Dict[str, float]:
+    """Sum Prometheus samples by metric name (labels folded together)."""
+    async with http.get(f"{base_url}/metrics") as response:
+        text = await response.text()
+    totals: Dict[str, float] = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            name = name.split("{", 1)[0]
+            totals[name] = totals.get(name, 0) + float(value)
+    return totals
+
+
+# ---------------------------------------------------------------------------
+# Simulated Vapi calls
+
+
+def load_audio(path: Optional[str], rate: int, seconds: float) -> bytes:
+    """Stereo linear16 audio: a WAV recording, or speech-like synthetic bursts."""
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getnchannels() != 2 or wav.getsampwidth() != SAMPLE_WIDTH or wav.getframerate() != rate:
+                sys.exit(f"{path}: need 16-bit stereo at {rate} Hz")
+            return wav.readframes(wav.getnframes())
+
+    # Alternating talkers: 1.5 s of tone on one channel while the other is near silent
+    samples = bytearray()
+    for i in range(int(rate * seconds)):
+        t = i / rate
+        talker = int(t / 1.5) % 2
+        voice = int(8000 * math.sin(2 * math.pi * 220 * t)) if (t % 1.5) < 1.2 else 0
+        hiss = (i * 7919) % 64 - 32
+        left, right = (voice, hiss) if talker == 0 else (hiss, voice)
+        samples += left.to_bytes(2, "little", signed=True) + right.to_bytes(2, "little", signed=True)
+    return bytes(samples)
+
+
+class StepResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.bytes_sent = 0
+        self.transcripts = 0
+        self.rejected = 0
+        self.failed = 0
+        self.late_frames = 0  # Frames the client itself could not send on time
+
+
+async def simulate_call(http: aiohttp.ClientSession, url: str, pcm: bytes, args, result: StepResult):
+    frame_bytes = args.rate * 2 * SAMPLE_WIDTH * args.frame_ms // 1000
+    frames = int(args.duration * 1000 / args.frame_ms)
+    sent_at: List[float] = []
+
+    try:
+        ws = await http.ws_connect(url)
+    except aiohttp.WSServerHandshakeError as e:
+        if e.status == 503:
+            result.rejected += 1
+        else:
+            result.failed += 1
+        return
+
+    async def read_transcripts():
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            received_at = time.monotonic()
+            data = json.loads(message.data)
+            words = data.get("transcription", "").split()
+            if not words or not words[-1].startswith("w"):
+                continue
+            result.transcripts += 1
+            frame = math.ceil(int(words[-1][1:]) / args.frame_ms) - 1
+            if 0 <= frame < len(sent_at):
+                result.latencies.append(received_at - sent_at[frame])
+
+    reader = asyncio.create_task(read_transcripts())
+    try:
+        await ws.send_str(json.dumps({"type": "start", "encoding": "linear16", "container": "raw",
+                                      "sampleRate": args.rate, "channels": 2}))
+        started = time.monotonic()
+        offset = 0
+        for i in range(frames):
+            delay = started + i * args.frame_ms / 1000 - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -args.frame_ms / 1000:
+                result.late_frames += 1
+
+            if offset + frame_bytes > len(pcm):
+                offset = 0
+            await ws.send_bytes(pcm[offset:offset + frame_bytes])
+            offset += frame_bytes
+            sent_at.append(time.monotonic())
+            result.bytes_sent += frame_bytes
+
+        # Hang up like Vapi does, and give the last transcript a moment to arrive
+        await asyncio.sleep(args.tail)
+        await ws.close()
+    except Exception:
+        result.failed += 1
+    finally:
+        try:
+            await asyncio.wait_for(reader, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            reader.cancel()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+# ---------------------------------------------------------------------------
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test for soniox-vapi-server")
+    parser.add_argument("--clients", default="1,5,10,25,50", help="comma-separated concurrent call counts to ramp through")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of audio each call streams (default: 15)")
+    parser.add_argument("--ramp", type=float, default=2, help="seconds over which a step's calls start (default: 2)")
+    parser.add_argument("--tail", type=float, default=1, help="seconds a call waits for transcripts before hanging up")
+    parser.add_argument("--rate", type=int, default=16000, help="sample rate of the simulated calls (default: 16000)")
+    parser.add_argument("--frame-ms", type=int, default=20, help="Vapi frame duration in ms (default: 20)")
+    parser.add_argument("--audio", help="16-bit stereo WAV to stream instead of synthetic audio")
+    parser.add_argument("--token-ms", type=int, default=300, help="stub: ms of audio per word (default: 300)")
+    parser.add_argument("--words-per-utterance", type=int, default=8, help="stub: words between <end> markers")
+    parser.add_argument("--stub-latency-ms", type=int, default=50, help="stub: delay before each response")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra server environment, e.g. --env VAPI_PACKET_MS=100 (repeatable)")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+async def run(args) -> List[Dict]:
+    stub = SonioxStub(args.token_ms, args.stub_latency_ms, args.words_per_utterance)
+    stub_server = await serve(stub.handler, "127.0.0.1", 0, max_size=None)
+    soniox_url = f"ws://127.0.0.1:{stub_server.sockets[0].getsockname()[1]}"
+
+    port = free_port()
+    env = {"SONIOX_API_KEY": "bench", "VAPI_LOG_LEVEL": "WARNING"}
+    env.update(item.split("=", 1) for item in args.env)
+    server = multiprocessing.get_context("spawn").Process(target=run_server, args=(port, soniox_url, env), daemon=True)
+    server.start()
+    stats = ProcessStats(server.pid)
+    base_url = f"http://127.0.0.1:{port}"
+
+    pcm = load_audio(args.audio, args.rate, seconds=30)
+    rows = []
+
+    try:
+        async with aiohttp.ClientSession() as http:
+            await wait_for_server(http, base_url, server)
+            await run_steps(http, base_url, stub, stats, pcm, args, rows)
+    finally:
+        server.terminate()
+        await asyncio.get_running_loop().run_in_executor(None, server.join, 10)
+        stub_server.close()
+    return rows
+
+
+async def wait_for_server(http: aiohttp.ClientSession, base_url: str, server: multiprocessing.Process):
+    """Wait up to 10s for /health to answer 200; exit if the server died or never came up."""
+    status = None
+    for _ in range(100):
+        if not server.is_alive():
+            break
+        try:
+            async with http.get(f"{base_url}/health") as response:
+                status = response.status
+            if status == 200:
+                return
+        except aiohttp.ClientConnectionError:
+            pass
+        await asyncio.sleep(0.1)
+
+    if not server.is_alive():
+        print(f"\n❌ Error: server under test exited with code {server.exitcode}")
+    else:
+        print(f"\n❌ Error: server under test did not become healthy "
+              f"(last /health status: {status or 'no answer'})")
+    sys.exit(1)
+
+
+async def run_steps(http: aiohttp.ClientSession, base_url: str, stub: SonioxStub, stats: ProcessStats,
+                    pcm: bytes, args, rows: List[Dict]):
+    print(f"{'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'CPU %':>7} {'RSS MB':>7} "
+          f"{'lost %':>7} {'dropped':>8} {'rejected':>8} {'failed':>7}")
+    print("-" * 84)
+
+    for clients in (int(n) for n in args.clients.split(",")):
+        result = StepResult()
+        before = await scrape_metrics(http, base_url)
+        stub_bytes = stub.bytes_received
+        cpu_before = stats.cpu_seconds()
+        started = time.monotonic()
+
+        calls = []
+        for i in range(clients):
+            calls.append(asyncio.create_task(simulate_call(
+                http, f"{base_url}/api/custom-transcriber", pcm, args, result)))
+            await asyncio.sleep(args.ramp / clients)
+        await asyncio.gather(*calls)
+
+        elapsed = time.monotonic() - started
+        cpu_after = stats.cpu_seconds()
+        after = await scrape_metrics(http, base_url)
+        dropped = (after.get("soniox_vapi_audio_queue_dropped_frames_total", 0)
+                   - before.get("soniox_vapi_audio_queue_dropped_frames_total", 0))
+        lost = 1 - (stub.bytes_received - stub_bytes) / result.bytes_sent if result.bytes_sent else 0.0
+
+        row = {
+            "clients": clients,
+            "p50_ms": percentile(result.latencies, 50) * 1000,
+            "p95_ms": percentile(result.latencies, 95) * 1000,
+            "p99_ms": percentile(result.latencies, 99) * 1000,
+            "cpu_percent": (cpu_after - cpu_before) / elapsed * 100 if cpu_before is not None else None,
+            "rss_mb": stats.rss_mb(),
+            "lost_percent": max(lost, 0.0) * 100,
+            "dropped_frames": int(dropped),
+            "rejected": result.rejected,
+            "failed": result.failed,
+            "transcripts": result.transcripts,
+            "client_late_frames": result.late_frames,
+        }
+        rows.append(row)
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else "n/a"
+
+        print(f"{clients:>6} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{fmt(row['cpu_percent'], '>7.1f')} {fmt(row['rss_mb'], '>7.1f')} {row['lost_percent']:>7.2f} "
+              f"{row['dropped_frames']:>8} {row['rejected']:>8} {row['failed']:>7}")
+        if result.late_frames:
+            print(f"       ⚠️  load generator fell behind on {result.late_frames} frames; "
+                  f"results at this step understate server capacity")
+
+
+def main():
+    args = parse_args()
+    rows = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "steps": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Admission control for the Vapi server
+Samples event loop lag and aggregate inbound audio rate in the background so
+new calls can be turned away cheaply once a worker is at capacity.
+"""
+import asyncio
+from typing import Any, Callable, Dict, Optional
+
+
+class LoadMonitor:
+    """Background sampler of event loop lag and inbound audio rate.
+
+    Lag is how late a periodic timer fires. It rises immediately and decays
+    smoothly, so a stall is visible right away but a single hiccup does not
+    keep the node closed. The inbound rate is a moving average of a byte counter.
+    """
+
+    def __init__(self, byte_counter: Callable[[], float], interval: float = 0.25, smoothing: float = 0.25):
+        self.byte_counter = byte_counter
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0  # Seconds
+        self.inbound_bps = 0.0  # Bytes per second
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def inbound_kbps(self) -> float:
+        return self.inbound_bps * 8 / 1000
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+        last_bytes = self.byte_counter()
+
+        while True:
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+
+            lag = max(now - last - self.interval, 0.0)
+            if lag > self.lag:
+                self.lag = lag
+            else:
+                self.lag += (lag - self.lag) * self.smoothing
+
+            total = self.byte_counter()
+            rate = (total - last_bytes) / (now - last)
+            self.inbound_bps += (rate - self.inbound_bps) * self.smoothing
+
+            last, last_bytes = now, total
+
+
+class AdmissionController:
+    """Decides whether a worker can take another call. A limit of 0 disables that check."""
+
+    def __init__(
+        self,
+        monitor: LoadMonitor,
+        max_sessions: int = 0,
+        max_inbound_kbps: float = 0,
+        max_loop_lag_ms: float = 0,
+    ):
+        self.monitor = monitor
+        self.max_sessions = max_sessions
+        self.max_inbound_kbps = max_inbound_kbps
+        self.max_loop_lag_ms = max_loop_lag_ms
+
+    def check(self, active_sessions: int) -> Optional[str]:
+        """Return why a new call must be refused, or None to accept it."""
+        if self.max_sessions and active_sessions >= self.max_sessions:
+            return "max_sessions"
+        if self.max_inbound_kbps and self.monitor.inbound_kbps >= self.max_inbound_kbps:
+            return "max_inbound_bitrate"
+        if self.max_loop_lag_ms and self.monitor.lag * 1000 >= self.max_loop_lag_ms:
+            return "loop_lag"
+        return None
+
+    def capacity(self, active_sessions: int) -> Dict[str, Any]:
+        """Usage against each limit plus an overall 0-100 routing weight."""
+        loop_lag_ms = self.monitor.lag * 1000
+        inbound_kbps = self.monitor.inbound_kbps
+        usage = {
+            "sessions": (active_sessions, self.max_sessions),
+            "inbound_kbps": (inbound_kbps, self.max_inbound_kbps),
+            "loop_lag_ms": (loop_lag_ms, self.max_loop_lag_ms),
+        }
+
+        report: Dict[str, Any] = {}
+        headroom = 1.0
+        for name, (current, limit) in usage.items():
+            entry = {"current": round(current, 1), "limit": limit or None}
+            if limit:
+                remaining = max(limit - current, 0)
+                entry["remaining"] = round(remaining, 1)
+                headroom = min(headroom, remaining / limit)
+            report[name] = entry
+
+        report["weight"] = int(headroom * 100)
+        return report
@@ -0,0 +1,219 @@
+"""
+Audio helpers for the Vapi server
+Frame-level PCM buffering and channel operations without per-sample Python loops.
+"""
+import time
+from typing import Iterator, List, Optional
+
+SAMPLE_WIDTH = 2  # Bytes per pcm_s16le sample
+
+# Vapi encoding names -> Soniox audio_format, and bytes per sample of each format
+SONIOX_FORMATS = {
+    "linear16": "pcm_s16le",
+    "pcm_s16le": "pcm_s16le",
+    "mulaw": "mulaw",
+    "mu-law": "mulaw",
+    "ulaw": "mulaw",
+    "alaw": "alaw",
+    "a-law": "alaw",
+}
+FORMAT_SAMPLE_WIDTHS = {"pcm_s16le": SAMPLE_WIDTH, "mulaw": 1, "alaw": 1}
+
+# memoryview.cast() formats for each supported sample width
+_CAST_FORMATS = {1: "B", 2: "H", 4: "I"}
+
+
+class ChannelSplitter:
+    """Deinterleave linear16 PCM frames into one mono stream per channel.
+
+    Frames are not required to end on a sample boundary: a trailing partial
+    sample frame is carried over and prepended to the next call.
+    """
+
+    def __init__(self, channels: int = 2, sample_width: int = SAMPLE_WIDTH):
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_width = channels * sample_width
+        self._carry = b""
+
+    def split(self, frame: bytes) -> List[bytes]:
+        """Return one mono PCM chunk per channel for this frame."""
+        if self._carry:
+            frame = self._carry + frame
+            self._carry = b""
+
+        usable = len(frame) - len(frame) % self.frame_width
+        if usable != len(frame):
+            self._carry = bytes(frame[usable:])
+
+        # Strided views over the sample array; tobytes() does the copy in C
+        samples = memoryview(frame)[:usable].cast(_CAST_FORMATS[self.sample_width])
+        return [samples[ch::self.channels].tobytes() for ch in range(self.channels)]
+
+
+class AudioRingBuffer:
+    """Fixed-capacity byte ring that overwrites the oldest audio when full.
+
+    The backing storage is allocated once. Drops happen in multiples of
+    ``align`` bytes so sample frames are never torn.
+    """
+
+    def __init__(self, capacity: int, align: int = 1):
+        self.align = max(align, 1)
+        self.capacity = max(capacity - capacity % self.align, 0)
+        self._buf = bytearray(self.capacity)
+        self._start = 0
+        self._size = 0
+
+        self.dropped_bytes = 0
+        self.peak_bytes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data) -> None:
+        """Append data, discarding the oldest bytes on overflow."""
+        view = memoryview(data).cast("B")
+        n = len(view)
+        if n == 0:
+            return
+        if self.capacity == 0:
+            self.dropped_bytes += n
+            return
+
+        if n >= self.capacity:
+            # Only the newest `capacity` bytes survive
+            self.dropped_bytes += self._size + n - self.capacity
+            view = view[n - self.capacity:]
+            n = self.capacity
+            self._start = 0
+            self._size = 0
+
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            overflow = min(overflow + (-overflow) % self.align, self._size)
+            self._start = (self._start + overflow) % self.capacity
+            self._size -= overflow
+            self.dropped_bytes += overflow
+
+        end = (self._start + self._size) % self.capacity
+        first = min(n, self.capacity - end)
+        self._buf[end:end + first] = view[:first]
+        if first < n:
+            self._buf[:n - first] = view[first:]
+        self._size += n
+        self.peak_bytes = max(self.peak_bytes, self._size)
+
+    def read_all(self) -> bytes:
+        """Remove and return everything buffered, oldest first."""
+        data = self.peek()
+        self._start = 0
+        self._size = 0
+        return data
+
+    def peek(self, last: Optional[int] = None) -> bytes:
+        """Return the newest `last` bytes (default: everything) without removing them."""
+        size = self._size if last is None else min(max(last, 0), self._size)
+        start = (self._start + self._size - size) % self.capacity if self.capacity else 0
+        end = start + size
+        if end <= self.capacity:
+            return bytes(self._buf[start:end])
+        return bytes(self._buf[start:]) + bytes(self._buf[:end - self.capacity])
+
+
+def _expand_mulaw(code: int) -> int:
+    code = ~code & 0xFF
+    magnitude = (((code & 0x0F) << 3) + 0x84) << ((code >> 4) & 0x07)
+    return 0x84 - magnitude if code & 0x80 else magnitude - 0x84
+
+
+def _expand_alaw(code: int) -> int:
+    code ^= 0x55
+    exponent = (code >> 4) & 0x07
+    magnitude = ((code & 0x0F) << 4) + 8
+    if exponent:
+        magnitude = (magnitude + 0x100) << (exponent - 1)
+    return magnitude if code & 0x80 else -magnitude
+
+
+def _byte_tables(expand):
+    """Translation tables for the low and high byte of each code's linear16 value."""
+    values = [expand(code) & 0xFFFF for code in range(256)]
+    return bytes(v & 0xFF for v in values), bytes(v >> 8 for v in values)
+
+
+_G711_TABLES = {"mulaw": _byte_tables(_expand_mulaw), "alaw": _byte_tables(_expand_alaw)}
+
+
+def decode_g711(frame, audio_format: str) -> bytes:
+    """Expand mu-law or A-law audio to linear16.
+
+    Each code is looked up in two 256-byte tables with bytes.translate(), one
+    for the low and one for the high output byte, so the work stays in C.
+    """
+    low, high = _G711_TABLES[audio_format]
+    codes = bytes(frame)
+    pcm = bytearray(len(codes) * SAMPLE_WIDTH)
+    pcm[0::2] = codes.translate(low)
+    pcm[1::2] = codes.translate(high)
+    return bytes(pcm)
+
+
+def peak_amplitude(frame) -> int:
+    """Return the absolute peak of a linear16 frame (0 for an empty frame)."""
+    usable = len(frame) - len(frame) % SAMPLE_WIDTH
+    if not usable:
+        return 0
+    samples = memoryview(frame)[:usable].cast("h")
+    # max()/min() iterate the buffer in C
+    return max(max(samples), -min(samples))
+
+
+class FrameCoalescer:
+    """Pack small audio frames into fixed-size packets in a reusable buffer.
+
+    push() yields memoryviews that are only valid until the generator is
+    resumed, so callers must finish sending each packet before advancing.
+    """
+
+    def __init__(self, packet_bytes: int):
+        self.packet_bytes = max(packet_bytes, 1)
+        self._buf = bytearray(self.packet_bytes)
+        self._view = memoryview(self._buf)
+        self._fill = 0
+        self.pending_since: Optional[float] = None  # Monotonic time of the oldest pending byte
+
+    @property
+    def pending(self) -> int:
+        return self._fill
+
+    def push(self, frame) -> Iterator[memoryview]:
+        """Add a frame, yielding every packet it completes."""
+        data = memoryview(frame).cast("B")
+        while data:
+            if self._fill == 0 and len(data) >= self.packet_bytes:
+                # Whole packet available in the input - no copy needed
+                yield data[:self.packet_bytes]
+                data = data[self.packet_bytes:]
+                continue
+
+            n = min(len(data), self.packet_bytes - self._fill)
+            self._view[self._fill:self._fill + n] = data[:n]
+            if self._fill == 0:
+                self.pending_since = time.monotonic()
+            self._fill += n
+            data = data[n:]
+
+            if self._fill == self.packet_bytes:
+                self._fill = 0
+                self.pending_since = None
+                yield self._view
+
+    def flush(self) -> Optional[memoryview]:
+        """Return the partial packet (valid until the next push), if any."""
+        if not self._fill:
+            return None
+        packet = self._view[:self._fill]
+        self._fill = 0
+        self.pending_since = None
+        return packet
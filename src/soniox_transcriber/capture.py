@@ -0,0 +1,149 @@
+"""
+Low-latency microphone capture for the console transcriber and dictation
+PyAudio runs in callback mode and PortAudio's thread copies each frame into a
+preallocated ring buffer, then wakes the sender's event loop through the
+on_data hook instead of it polling a queue. Frames are 10-40 ms
+(SONIOX_FRAME_MS), so audio leaves the machine a frame after it is spoken
+rather than a 240 ms chunk later.
+"""
+import os
+from typing import Callable, Optional
+
+try:
+    import pyaudio
+except ImportError:  # The ring buffer stays usable (and benchmarkable) without PortAudio
+    pyaudio = None
+
+from soniox_transcriber.audio import SAMPLE_WIDTH
+
+FRAME_MS = int(os.environ.get("SONIOX_FRAME_MS", "20"))
+BUFFER_MS = 2000  # Audio the ring holds if the sender falls behind
+MIN_FRAME_MS = 10
+MAX_FRAME_MS = 40
+
+
+class RingBuffer:
+    """Single-producer, single-consumer byte ring over preallocated memory.
+
+    The producer only advances `written` and the consumer only `consumed`,
+    each after copying its bytes, so the two sides need no lock: every index
+    has one writer and int stores are atomic under the GIL. A write that does
+    not fit is dropped whole and counted as an overflow.
+    """
+
+    __slots__ = ("capacity", "_buffer", "_view", "written", "consumed", "overflows", "dropped_bytes")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.written = 0  # Total bytes written (producer side)
+        self.consumed = 0  # Total bytes read (consumer side)
+        self.overflows = 0
+        self.dropped_bytes = 0
+
+    def available(self) -> int:
+        return self.written - self.consumed
+
+    def write(self, data: bytes) -> bool:
+        size = len(data)
+        if size > self.capacity - (self.written - self.consumed):
+            self.overflows += 1
+            self.dropped_bytes += size
+            return False
+        start = self.written % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < size:
+            self._view[:size - first] = data[first:]
+        self.written += size  # Publish only once the bytes are in place
+        return True
+
+    def read(self, max_bytes: Optional[int] = None) -> bytes:
+        """Take up to max_bytes (default: everything available)."""
+        size = self.written - self.consumed
+        if max_bytes is not None:
+            size = min(size, max_bytes)
+        if size <= 0:
+            return b""
+        start = self.consumed % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._view[start:start + first])
+        if first < size:
+            data += self._view[:size - first]
+        self.consumed += size
+        return data
+
+
+class AudioCapture:
+    """Microphone capture in PyAudio callback mode, read with wake-on-data (see sources.captured_audio).
+
+    Counters: `overflows` (frames dropped because the sender fell more than
+    the ring's worth behind), `input_overflows` (PortAudio lost input before
+    the callback ran) and `underruns` (the sender waited several frames and
+    no audio came).
+    """
+
+    def __init__(self, rate: int = 16000, channels: int = 1, frame_ms: int = FRAME_MS,
+                 buffer_ms: int = BUFFER_MS):
+        if not MIN_FRAME_MS <= frame_ms <= MAX_FRAME_MS:
+            raise ValueError(f"Frame duration must be {MIN_FRAME_MS}-{MAX_FRAME_MS} ms, got {frame_ms}")
+        self.rate = rate
+        self.channels = channels
+        self.frame_ms = frame_ms
+        self.frame_samples = rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * channels * SAMPLE_WIDTH
+        self.ring = RingBuffer(self.frame_bytes * max(2, buffer_ms // frame_ms))
+        self.input_overflows = 0
+        self.underruns = 0
+        self.on_data: Optional[Callable[[], None]] = None  # Called from PortAudio's thread after each frame
+        self._pyaudio = None
+        self._stream = None
+
+    @property
+    def overflows(self) -> int:
+        return self.ring.overflows
+
+    def start(self):
+        """Open the default input device and start capturing."""
+        if pyaudio is None:
+            raise RuntimeError("PyAudio is not installed")
+        self._pyaudio = pyaudio.PyAudio()
+        try:
+            self._stream = self._pyaudio.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                frames_per_buffer=self.frame_samples,
+                stream_callback=self._callback,
+            )
+        except Exception:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+            raise
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        # PortAudio's thread: copy and signal, nothing else
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self.ring.write(in_data)
+        notify = self.on_data
+        if notify is not None:
+            notify()
+        return None, pyaudio.paContinue
+
+    def stop(self):
+        """Stop capturing and release the device."""
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+    def summary(self) -> str:
+        return (f"🎤 Capture: {self.frame_ms} ms frames, {self.overflows} overflows "
+                f"({self.ring.dropped_bytes} bytes dropped), {self.input_overflows} input overflows, "
+                f"{self.underruns} underruns")
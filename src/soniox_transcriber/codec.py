@@ -0,0 +1,167 @@
+"""
+Pluggable JSON codec for Soniox and Vapi messages
+Uses msgspec or orjson when installed and falls back to the standard library.
+Soniox responses decode straight into typed Token/SonioxResponse objects.
+
+Set SONIOX_JSON_CODEC=msgspec|orjson|json to force a backend.
+"""
+import json
+import os
+from typing import Any, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _select_backend() -> str:
+    available = {"json": True, "orjson": orjson is not None, "msgspec": msgspec is not None}
+    requested = os.environ.get("SONIOX_JSON_CODEC")
+    if requested:
+        if not available.get(requested):
+            raise ImportError(f"SONIOX_JSON_CODEC={requested} requested but not installed")
+        return requested
+    for name in ("msgspec", "orjson", "json"):
+        if available[name]:
+            return name
+    return "json"
+
+
+BACKEND = _select_backend()
+
+
+if msgspec is not None:
+
+    class Token(msgspec.Struct, gc=False):
+        """A single Soniox token."""
+
+        text: str = ""
+        is_final: bool = False
+        speaker: Union[int, str, None] = None
+        language: Optional[str] = None
+        start_ms: Optional[int] = None
+        end_ms: Optional[int] = None
+        confidence: Optional[float] = None
+
+    class SonioxResponse(msgspec.Struct, gc=False):
+        """A Soniox real-time response message."""
+
+        tokens: List[Token] = []
+        error_code: Union[int, str, None] = None
+        error_message: Optional[str] = None
+        finished: bool = False
+        final_audio_proc_ms: Optional[int] = None
+        total_audio_proc_ms: Optional[int] = None
+
+    _response_decoder = msgspec.json.Decoder(SonioxResponse, strict=False)
+
+else:
+
+    class Token:  # type: ignore[no-redef]
+        """A single Soniox token."""
+
+        __slots__ = ("text", "is_final", "speaker", "language", "start_ms", "end_ms", "confidence")
+
+        def __init__(
+            self,
+            text: str = "",
+            is_final: bool = False,
+            speaker: Union[int, str, None] = None,
+            language: Optional[str] = None,
+            start_ms: Optional[int] = None,
+            end_ms: Optional[int] = None,
+            confidence: Optional[float] = None,
+        ):
+            self.text = text
+            self.is_final = is_final
+            self.speaker = speaker
+            self.language = language
+            self.start_ms = start_ms
+            self.end_ms = end_ms
+            self.confidence = confidence
+
+        def __repr__(self) -> str:
+            return f"Token(text={self.text!r}, is_final={self.is_final}, speaker={self.speaker!r})"
+
+    class SonioxResponse:  # type: ignore[no-redef]
+        """A Soniox real-time response message."""
+
+        __slots__ = ("tokens", "error_code", "error_message", "finished",
+                     "final_audio_proc_ms", "total_audio_proc_ms")
+
+        def __init__(self, data: dict):
+            get = data.get
+            self.tokens = [
+                Token(
+                    t.get("text", ""),
+                    t.get("is_final", False),
+                    t.get("speaker"),
+                    t.get("language"),
+                    t.get("start_ms"),
+                    t.get("end_ms"),
+                    t.get("confidence"),
+                )
+                for t in get("tokens", ())
+            ]
+            self.error_code = get("error_code")
+            self.error_message = get("error_message")
+            self.finished = get("finished", False)
+            self.final_audio_proc_ms = get("final_audio_proc_ms")
+            self.total_audio_proc_ms = get("total_audio_proc_ms")
+
+        def __repr__(self) -> str:
+            return f"SonioxResponse(tokens={self.tokens!r}, finished={self.finished})"
+
+
+# Exceptions raised for malformed input by whichever backend is active
+if msgspec is not None:
+    DecodeError: tuple = (ValueError, msgspec.DecodeError)
+else:
+    DecodeError = (ValueError,)
+
+
+if BACKEND == "msgspec":
+    _encoder = msgspec.json.Encoder()
+    _decode_any = msgspec.json.decode
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode a JSON document."""
+        return _decode_any(data)
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a JSON text frame payload."""
+        return _encoder.encode(obj).decode()
+
+elif BACKEND == "orjson":
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode a JSON document."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a JSON text frame payload."""
+        return orjson.dumps(obj).decode()
+
+else:
+    loads = json.loads
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a JSON text frame payload."""
+        return json.dumps(obj, ensure_ascii=False)
+
+
+def decode_response(data: Union[str, bytes]) -> SonioxResponse:
+    """Decode a Soniox response message into typed tokens."""
+    if BACKEND == "msgspec":
+        return _response_decoder.decode(data)
+
+    result = loads(data)
+    if msgspec is not None:
+        return msgspec.convert(result, SonioxResponse, strict=False)
+    return SonioxResponse(result)
@@ -3,29 +3,29 @@
 System-wide dictation tool using Soniox
 Types transcribed text into any focused application (Sublime Text, browsers, etc.)
 """
-import json
+import asyncio
 import os
 import threading
-import queue
 import sys
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 from dotenv import load_dotenv
 
-import pyaudio
 import pyautogui
 from pynput import keyboard
-from websockets import ConnectionClosedOK
-from websockets.sync.client import connect
+
+from soniox_transcriber import engine
+from soniox_transcriber.codec import SonioxResponse
+from soniox_transcriber.history import SessionHistory
+from soniox_transcriber.sources import MicrophoneSource
 
 # Load environment variables
 load_dotenv()
 
-SONIOX_WEBSOCKET_URL = "wss://stt-rt.soniox.com/transcribe-websocket"
+SONIOX_WEBSOCKET_URL = engine.SONIOX_WEBSOCKET_URL
 
 # Audio recording parameters
-CHUNK_SIZE = 3840
-FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 
@@ -48,70 +48,25 @@ def get_config(api_key: str) -> dict:
     return config
 
 
-def capture_audio(audio_queue: queue.Queue, stop_event: threading.Event) -> None:
-    """Capture audio from microphone and put chunks into queue."""
-    p = pyaudio.PyAudio()
-
+def start_capture() -> Optional[MicrophoneSource]:
+    """Start capturing from the microphone, or print troubleshooting tips and return None."""
     try:
-        stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE,
-        )
-
-        while not stop_event.is_set():
-            with recording_lock:
-                if not is_recording:
-                    time.sleep(0.1)
-                    continue
-
-            try:
-                data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                audio_queue.put(data)
-            except Exception as e:
-                print(f"⚠️  Error reading audio: {e}")
-                break
-
-        stream.stop_stream()
-        stream.close()
-
+        capture = MicrophoneSource(rate=RATE, channels=CHANNELS)
+        capture.start()
     except Exception as e:
         print(f"\n❌ Error initializing audio: {e}")
         print("\nTroubleshooting tips:")
         print("- Make sure your microphone is connected")
         print("- Check System Settings > Privacy & Security > Microphone")
         print("- Grant microphone permission to your terminal/Python")
+        return None
+    return capture
 
-    finally:
-        p.terminate()
-
-
-def stream_audio_to_websocket(
-    audio_queue: queue.Queue,
-    ws,
-    stop_event: threading.Event
-) -> None:
-    """Read audio chunks from queue and send to websocket."""
-    try:
-        while not stop_event.is_set():
-            with recording_lock:
-                if not is_recording:
-                    time.sleep(0.1)
-                    continue
-
-            try:
-                data = audio_queue.get(timeout=0.1)
-                ws.send(data)
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"⚠️  Error sending audio: {e}")
-                break
 
-    except Exception as e:
-        print(f"⚠️  Error in audio streaming: {e}")
+def recording_active() -> bool:
+    """Whether captured audio should be sent (recording toggled on)."""
+    with recording_lock:
+        return is_recording
 
 
 def normalize_text(text: str) -> str:
@@ -169,88 +124,51 @@ class DictationSession:
 
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.audio_queue = queue.Queue()
-        self.stop_event = threading.Event()
-        self.ws = None
-        self.final_tokens = []
-        self.last_typed_count = 0
+        self.capture: Optional[MicrophoneSource] = None
+        self.history = SessionHistory()
+        # Typing is slow (a keystroke every 10 ms); one worker keeps it off the
+        # event loop and in order
+        self.typer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="typing")
 
     def start(self):
-        """Start the dictation session."""
-        config = get_config(self.api_key)
-
-        try:
-            self.ws = connect(SONIOX_WEBSOCKET_URL)
-            self.ws.send(json.dumps(config))
-
-            # Start audio capture thread
-            self.capture_thread = threading.Thread(
-                target=capture_audio,
-                args=(self.audio_queue, self.stop_event),
-                daemon=True,
-            )
-            self.capture_thread.start()
-
-            # Start audio streaming thread
-            self.streaming_thread = threading.Thread(
-                target=stream_audio_to_websocket,
-                args=(self.audio_queue, self.ws, self.stop_event),
-                daemon=True,
-            )
-            self.streaming_thread.start()
-
-            print("✅ Connected to Soniox!")
-
-        except Exception as e:
-            print(f"❌ Error connecting: {e}")
-            raise
-
-    def process_transcription(self):
-        """Process incoming transcription and type text."""
-        try:
-            while not self.stop_event.is_set():
-                try:
-                    message = self.ws.recv(timeout=0.1)
-                except TimeoutError:
-                    continue
-
-                res = json.loads(message)
-
-                # Check for errors
-                if res.get("error_code") is not None:
-                    print(f"\n❌ Error: {res['error_code']} - {res['error_message']}")
-                    break
-
-                # Parse tokens
-                for token in res.get("tokens", []):
-                    if token.get("text") and token.get("is_final"):
-                        self.final_tokens.append(token)
-
-                # Type new final tokens
-                if len(self.final_tokens) > self.last_typed_count:
-                    new_tokens = self.final_tokens[self.last_typed_count:]
-                    for token in new_tokens:
-                        text = token["text"]
-                        type_text(text)
-                    self.last_typed_count = len(self.final_tokens)
-
-                # Check if session finished
-                if res.get("finished"):
-                    break
-
-        except ConnectionClosedOK:
-            pass
-        except Exception as e:
-            print(f"⚠️  Error processing transcription: {e}")
+        """Start capturing audio; it is sent once connected and while recording."""
+        # PortAudio calls back on its own thread
+        self.capture = start_capture()
+        if self.capture is None:
+            raise RuntimeError("No microphone input")
+
+    async def run(self, on_connected: Optional[Callable[[], None]] = None) -> str:
+        """Stream to Soniox and type what it transcribes until the session ends."""
+        session = engine.TranscriptionEngine(
+            get_config(self.api_key), self.capture, self.handle_response,
+            is_active=recording_active, on_connected=on_connected, url=SONIOX_WEBSOCKET_URL,
+        )
+        return await session.run()
+
+    def handle_response(self, res: SonioxResponse) -> bool:
+        """Type the final tokens of a response; returns True on error."""
+        # Check for errors
+        if res.error_code is not None:
+            print(f"\n❌ Error: {res.error_code} - {res.error_message}")
+            return True
+
+        # Type new final tokens as they arrive
+        new_tokens = [token for token in res.tokens if token.text and token.is_final]
+        if new_tokens:
+            loop = asyncio.get_running_loop()
+            for token in new_tokens:
+                loop.run_in_executor(self.typer, type_text, token.text)
+            self.history.add(new_tokens, normalize_text("".join(t.text for t in new_tokens)))
+        return False
 
     def stop(self):
         """Stop the dictation session."""
-        self.stop_event.set()
-        if self.ws:
-            try:
-                self.ws.close()
-            except:
-                pass
+        if self.capture is not None:
+            self.capture.stop()
+            print("\n" + self.capture.summary())
+        self.typer.shutdown(wait=False)
+        self.history.close()
+        print("\n" + self.history.report())
 
 
 def on_press(key, session: DictationSession):
@@ -294,9 +212,8 @@ def run_dictation(api_key: str):
 
     session = DictationSession(api_key)
 
-    try:
-        session.start()
-
+    def on_connected():
+        print("✅ Connected to Soniox!")
         print("\n📝 Ready to dictate!")
         print("\nControls:")
         print("  • Press Cmd+Shift+Space to START/STOP recording")
@@ -305,13 +222,17 @@ def run_dictation(api_key: str):
         print("into whatever application has focus.\n")
         print("-" * 60)
 
+    try:
+        session.start()
+
         # Set up global hotkey listener
         with keyboard.GlobalHotKeys({
             '<cmd>+<shift>+<space>': on_activate,
         }) as hotkey_listener:
 
-            # Process transcription in main thread
-            session.process_transcription()
+            # Stream and type on one event loop in the main thread
+            if asyncio.run(session.run(on_connected)) == engine.INTERRUPTED:
+                print("\n\n⏹️  Stopping dictation...")
 
     except KeyboardInterrupt:
         print("\n\n⏹️  Stopping dictation...")
@@ -0,0 +1,162 @@
+"""
+Asyncio streaming engine for the console transcriber and dictation
+One event loop does all the work of a session: audio from the source (for the
+microphone, PortAudio's callback wakes the loop through call_soon_threadsafe)
+is sent to Soniox as soon as it arrives, and each Soniox response is handed to
+the caller. Nothing polls, so an idle session does not wake up at all.
+"""
+import asyncio
+import signal
+import time
+from typing import Callable, Iterator, Optional
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from soniox_transcriber import codec
+from soniox_transcriber.sources import AudioSource
+from soniox_transcriber.vad import FINALIZE_MESSAGE, KEEPALIVE_MESSAGE, VoiceGate
+
+SONIOX_WEBSOCKET_URL = "wss://stt-rt.soniox.com/transcribe-websocket"
+
+# Why a session ended, as returned by TranscriptionEngine.run()
+FINISHED = "finished"  # Soniox sent its final response (e.g. after the source ran out)
+ENDED = "ended"  # on_response asked to stop
+CLOSED = "closed"  # Soniox closed the connection
+INTERRUPTED = "interrupted"  # Ctrl+C
+
+
+class TranscriptionEngine:
+    """Streams one audio source to Soniox and passes its responses to on_response.
+
+    When the source is exhausted, end-of-audio is sent and the session runs
+    until Soniox sends its final response.
+
+    on_response runs on the event loop and returns True to end the session.
+    While is_active() is False captured audio is discarded instead of sent.
+    With a gate, silence is held back and keepalive/finalize messages are
+    sent as for the Vapi server.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        source: AudioSource,
+        on_response: Callable[[codec.SonioxResponse], bool],
+        gate: Optional[VoiceGate] = None,
+        is_active: Optional[Callable[[], bool]] = None,
+        on_connected: Optional[Callable[[], None]] = None,
+        url: str = SONIOX_WEBSOCKET_URL,
+    ):
+        self.config = config
+        self.source = source
+        self.on_response = on_response
+        self.gate = gate
+        self.is_active = is_active
+        self.on_connected = on_connected
+        self.url = url
+        self.audio_bytes = 0  # Read from the source
+        self.send_seconds = 0.0  # From connecting until the source ran out or the session ended
+        self._audio_ended = False
+        self._interrupted = False
+
+    async def run(self) -> str:
+        """Run the session until it ends; returns why (FINISHED, ENDED, CLOSED or INTERRUPTED).
+
+        Ctrl+C cancels the session cleanly: audio stops, end-of-audio is
+        sent and the connection is closed before returning INTERRUPTED. If
+        the source fails, end-of-audio is sent the same way and its error is
+        raised at once rather than after Soniox times out the idle stream.
+        """
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        try:
+            loop.add_signal_handler(signal.SIGINT, self._interrupt, task)
+            handles_sigint = True
+        except (NotImplementedError, RuntimeError):
+            handles_sigint = False  # Windows or not the main thread: KeyboardInterrupt as usual
+
+        try:
+            return await self._run()
+        except asyncio.CancelledError:
+            if not self._interrupted:
+                raise
+            if hasattr(task, "uncancel"):
+                task.uncancel()
+            return INTERRUPTED
+        finally:
+            if handles_sigint:
+                loop.remove_signal_handler(signal.SIGINT)
+
+    def _interrupt(self, task: asyncio.Task):
+        self._interrupted = True
+        task.cancel()
+
+    async def _run(self) -> str:
+        async with connect(self.url) as ws:
+            await ws.send(codec.dumps(self.config))
+            if self.on_connected is not None:
+                self.on_connected()
+
+            sender = asyncio.create_task(self._send_audio(ws))
+            receiver = asyncio.create_task(self._receive(ws))
+            try:
+                await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+                if sender.done() and not sender.cancelled():
+                    error = sender.exception()
+                    if error is not None and not isinstance(error, ConnectionClosed):
+                        raise error  # The source failed
+                return await receiver
+            finally:
+                sender.cancel()
+                receiver.cancel()
+                await asyncio.gather(sender, receiver, return_exceptions=True)
+                if not self._audio_ended:
+                    try:
+                        await ws.send("")  # End of audio
+                    except ConnectionClosed:
+                        pass
+
+    async def _receive(self, ws) -> str:
+        async for message in ws:
+            res = codec.decode_response(message)
+            if self.on_response(res):
+                return ENDED
+            if res.finished:
+                return FINISHED
+        return CLOSED
+
+    async def _send_audio(self, ws):
+        started = time.monotonic()
+        try:
+            async for data in self.source.frames():
+                self.audio_bytes += len(data)
+                if self.is_active is not None and not self.is_active():
+                    continue
+                for message in self._outgoing(data):
+                    await ws.send(message)
+        finally:
+            self.send_seconds = time.monotonic() - started
+        # Source exhausted: Soniox finishes the transcript and sends its final response
+        self._audio_ended = True
+        await ws.send("")
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.audio_bytes / self.source.bytes_per_second
+
+    def _outgoing(self, data: bytes) -> Iterator:
+        """Messages to send for a piece of captured audio."""
+        gate = self.gate
+        if gate is None:
+            yield data
+            return
+        data = gate.push(data)
+        if data is None:
+            if gate.keepalive_due():
+                yield KEEPALIVE_MESSAGE
+            return
+        yield data
+        if not gate.open:
+            # End of speech - finalize now instead of waiting for more audio
+            yield FINALIZE_MESSAGE
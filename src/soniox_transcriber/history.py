@@ -0,0 +1,83 @@
+"""
+Bounded transcript history for the console transcriber and dictation
+Only a token count stays in memory; finalized text can be appended to a
+transcript file as it arrives, so an all-day session runs in constant memory
+without losing its transcript.
+
+Set SONIOX_TRANSCRIPT_FILE to keep the full transcript on disk.
+"""
+import os
+import sys
+import time
+from typing import List, Optional
+
+from soniox_transcriber.codec import Token
+
+TRANSCRIPT_FILE = os.environ.get("SONIOX_TRANSCRIPT_FILE", "")
+TRANSCRIPT_FLUSH_SECONDS = 1.0  # Most text a crash can lose from the transcript file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class TranscriptFile:
+    """Append-only transcript file, buffered and flushed at most once a second (and on close)."""
+
+    def __init__(self, path: str, flush_interval: float = TRANSCRIPT_FLUSH_SECONDS, clock=time.monotonic):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.chars_written = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._flushed_at = clock()
+
+    def write(self, text: str):
+        if not text:
+            return
+        self._file.write(text)
+        self.chars_written += len(text)
+        now = self.clock()
+        if now - self._flushed_at >= self.flush_interval:
+            self._file.flush()
+            self._flushed_at = now
+
+    def close(self):
+        self._file.close()
+
+
+class SessionHistory:
+    """Final tokens of one session: counted in memory, the text optionally kept on disk."""
+
+    def __init__(self, transcript_path: str = TRANSCRIPT_FILE):
+        self.transcript: Optional[TranscriptFile] = TranscriptFile(transcript_path) if transcript_path else None
+        self.total_tokens = 0
+
+    def add(self, tokens: List[Token], text: str):
+        """Record newly finalized tokens and the text they rendered to."""
+        self.total_tokens += len(tokens)
+        if self.transcript is not None:
+            self.transcript.write(text)
+
+    def report(self) -> str:
+        """One-line memory report, plus where the full transcript went."""
+        line = f"🧠 Transcript history: {self.total_tokens} final tokens"
+        rss = peak_rss_bytes()
+        if rss:
+            line += f", peak RSS {rss / (1 << 20):.0f} MiB"
+        if self.transcript is not None:
+            line += f"\n📄 Full transcript: {self.transcript.path}"
+        return line
+
+    def close(self):
+        if self.transcript is not None:
+            self.transcript.close()
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process, 0 if unavailable."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on Linux
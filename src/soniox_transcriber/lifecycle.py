@@ -0,0 +1,93 @@
+"""
+Serving with a graceful drain
+On SIGTERM/SIGINT the server keeps listening while the app drains its live
+calls, so load balancers can still read /health, and only then shuts down.
+A second signal cuts the drain short.
+"""
+import asyncio
+import signal
+import socket
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from aiohttp import web
+
+from soniox_transcriber.log import get_logger
+
+logger = get_logger("soniox_transcriber.lifecycle")
+
+DrainCallback = Callable[[web.Application], Awaitable[None]]
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class DrainState:
+    """Draining flag shared by request handlers and the shutdown sequence."""
+
+    def __init__(self):
+        self.draining = False
+        self.started_at: Optional[float] = None
+
+    def start(self):
+        self.draining = True
+        self.started_at = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds since the drain started (0 if not draining)."""
+        return time.monotonic() - self.started_at if self.started_at is not None else 0.0
+
+
+async def serve(
+    app: web.Application,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    sock: Optional[socket.socket] = None,
+    drain: Optional[DrainCallback] = None,
+    signals: Tuple[int, ...] = STOP_SIGNALS,
+):
+    """Serve app until one of `signals` arrives, then await drain(app) before closing listeners."""
+    runner = web.AppRunner(app, handle_signals=False)
+    await runner.setup()
+    site = web.SockSite(runner, sock) if sock is not None else web.TCPSite(runner, host, port)
+    await site.start()
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    drain_task: Optional[asyncio.Task] = None
+
+    def on_signal():
+        if not stop.is_set():
+            stop.set()
+        elif drain_task is not None and not drain_task.done():
+            logger.warning("⏹️  Second signal received, skipping the rest of the drain",
+                           extra={"event": "drain_interrupted"})
+            drain_task.cancel()
+
+    for signum in signals:
+        loop.add_signal_handler(signum, on_signal)
+
+    try:
+        await stop.wait()
+        if drain is not None:
+            drain_task = asyncio.create_task(drain(app))
+            try:
+                await drain_task
+            except asyncio.CancelledError:
+                if not drain_task.cancelled():
+                    raise
+    finally:
+        for signum in signals:
+            loop.remove_signal_handler(signum)
+        await runner.cleanup()
+
+
+def run_app(
+    app: web.Application,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    sock: Optional[socket.socket] = None,
+    drain: Optional[DrainCallback] = None,
+    signals: Tuple[int, ...] = STOP_SIGNALS,
+):
+    """Blocking wrapper around serve()."""
+    asyncio.run(serve(app, host=host, port=port, sock=sock, drain=drain, signals=signals))
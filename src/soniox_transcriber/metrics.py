@@ -0,0 +1,179 @@
+"""
+Minimal Prometheus metrics for the Vapi server
+Counters, gauges and histograms that are cheap enough for the audio hot path:
+plain attribute updates on the event loop thread, no locks and no allocation
+per observation. Rendered in the Prometheus text exposition format.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Seconds; covers pooled connects (~0) up to slow TLS handshakes and long turns
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PARSE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.value)}"]
+
+
+class LabeledCounter:
+    """Counter split by the value of a single label."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label: str):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.values: Dict[str, float] = {}
+
+    def inc(self, label_value: str, amount: float = 1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f'{self.name}{{{self.label}="{label_value}"}} {_format_value(value)}'
+            for label_value, value in sorted(self.values.items())
+        ]
+
+
+class Gauge:
+    """Value that can go up and down, or is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self.callback = callback
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self) -> List[str]:
+        value = self.callback() if self.callback is not None else self.value
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram:
+    """Cumulative histogram over fixed bucket upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self.register(Counter(name, help_text))
+
+    def labeled_counter(self, name: str, help_text: str, label: str) -> LabeledCounter:
+        return self.register(LabeledCounter(name, help_text, label))
+
+    def gauge(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, help_text, callback))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class AudioTimeline:
+    """Maps a stream's upstream audio position to when that audio arrived.
+
+    Fixed-size ring of (audio end ms, arrival time) pairs, preallocated so
+    recording a packet does not allocate.
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._audio_ms = [0.0] * capacity
+        self._arrived_at = [0.0] * capacity
+        self._next = 0
+        self._count = 0
+
+    def record(self, audio_end_ms: float, arrived_at: float):
+        self._audio_ms[self._next] = audio_end_ms
+        self._arrived_at[self._next] = arrived_at
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def arrival_time(self, audio_ms: float) -> Optional[float]:
+        """Arrival time of the packet containing audio_ms, if still tracked."""
+        found = None
+        index = self._next
+        for _ in range(self._count):
+            index = (index - 1) % self.capacity
+            if self._audio_ms[index] < audio_ms:
+                return found
+            found = self._arrived_at[index]
+        if self._count == self.capacity:
+            # The packet before the oldest one was overwritten, so audio_ms may predate the window
+            return None
+        return found  # Nothing overwritten yet: the oldest packet starts the stream
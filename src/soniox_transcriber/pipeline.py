@@ -0,0 +1,143 @@
+"""
+Back-pressured audio queue between Vapi ingress and Soniox egress
+Bounds per-session memory and decides what to drop when the upstream falls behind.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+POLICY_BLOCK = "block"
+POLICY_DROP_OLDEST = "drop-oldest"
+POLICY_DROP_SILENCE_FIRST = "drop-silence-first"
+OVERFLOW_POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_SILENCE_FIRST)
+
+
+class AudioSendQueue:
+    """Bounded FIFO of audio frames with a configurable overflow policy.
+
+    - block: put() waits for the consumer, pushing back on the producer
+    - drop-oldest: the oldest queued frame is discarded
+    - drop-silence-first: the oldest silent frame is discarded, falling back
+      to the oldest frame when nothing queued is silent
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        policy: str = POLICY_DROP_OLDEST,
+        is_silent: Optional[Callable[[bytes], bool]] = None,
+    ):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if policy == POLICY_DROP_SILENCE_FIRST and is_silent is None:
+            raise ValueError("drop-silence-first requires an is_silent function")
+
+        self.maxsize = max(maxsize, 1)
+        self.policy = policy
+        self.is_silent = is_silent
+        # Entries are [frame, silent, enqueued_at] - silent is computed lazily on overflow
+        self._frames: Deque[List] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._closed = False
+
+        # Monotonic enqueue time of the frame most recently returned by get()
+        self.last_enqueued_at = 0.0
+
+        # Instrumentation
+        self.high_water = 0
+        self.dropped_frames = 0
+        self.dropped_bytes = 0
+        self.dropped_silent_frames = 0
+        self.blocked_puts = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    async def put(self, frame: bytes):
+        """Enqueue a frame, applying the overflow policy when full."""
+        if self._closed:
+            return
+
+        if len(self._frames) >= self.maxsize:
+            if self.policy == POLICY_BLOCK:
+                self.blocked_puts += 1
+                while len(self._frames) >= self.maxsize and not self._closed:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                if self._closed:
+                    return
+            else:
+                self._drop_one()
+
+        self._frames.append([frame, None, time.monotonic()])
+        self.high_water = max(self.high_water, len(self._frames))
+        self._not_empty.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Dequeue the next frame.
+
+        Returns None once closed and drained, or if timeout seconds pass
+        without a frame (check `closed` to tell the two apart).
+        """
+        timer = None
+        timed_out = []
+
+        def on_timeout():
+            timed_out.append(True)
+            self._not_empty.set()
+
+        try:
+            while not self._frames:
+                if self._closed or timed_out:
+                    return None
+                if timeout is not None and timer is None:
+                    timer = asyncio.get_running_loop().call_later(timeout, on_timeout)
+                self._not_empty.clear()
+                await self._not_empty.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        frame, _, self.last_enqueued_at = self._frames.popleft()
+        self._not_full.set()
+        return frame
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Stop accepting frames; get() returns None after the backlog drains."""
+        self._closed = True
+        self._not_empty.set()
+        self._not_full.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue counters for session statistics."""
+        return {
+            "queued": len(self._frames),
+            "high_water": self.high_water,
+            "dropped_frames": self.dropped_frames,
+            "dropped_bytes": self.dropped_bytes,
+            "dropped_silent_frames": self.dropped_silent_frames,
+            "blocked_puts": self.blocked_puts,
+        }
+
+    def _drop_one(self):
+        victim = 0
+        if self.policy == POLICY_DROP_SILENCE_FIRST:
+            for index, entry in enumerate(self._frames):
+                if entry[1] is None:
+                    entry[1] = self.is_silent(entry[0])
+                if entry[1]:
+                    victim = index
+                    self.dropped_silent_frames += 1
+                    break
+
+        frame = self._frames[victim][0]
+        del self._frames[victim]
+        self.dropped_frames += 1
+        self.dropped_bytes += len(frame)
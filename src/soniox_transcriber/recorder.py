@@ -0,0 +1,175 @@
+"""
+Call recording for the Vapi server
+Saves a call's inbound audio and the Soniox responses it produced, with their
+timings, so a bad or slow call can be replayed offline (see replay.py). All
+file I/O happens on one background thread; the event loop only enqueues.
+
+A recording is a directory holding:
+    events.jsonl  One JSON object per line: "start" (audio config), then
+                  "response" (raw Soniox message per stream), "reconnect"
+                  and finally "end" (session stats), each with its time "t"
+    audio.bin     Inbound Vapi frames as received, each prefixed by a
+                  (t: float64, length: uint32) little-endian header
+
+Times are seconds since the Vapi start message.
+"""
+import atexit
+import functools
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from soniox_transcriber import codec
+from soniox_transcriber.log import get_logger
+
+AUDIO_FILE = "audio.bin"
+EVENTS_FILE = "events.jsonl"
+FRAME_HEADER = struct.Struct("<dI")
+
+BUFFER_SIZE = 1 << 20  # Per file, so the writer thread issues few large writes
+MAX_PENDING_BYTES = 64 << 20  # Audio waiting for the writer before frames are dropped
+
+logger = get_logger("soniox_transcriber.recorder")
+
+
+class RecordingWriter:
+    """Background thread doing the file I/O of every recording in this process.
+
+    Jobs run in submission order. Audio is dropped rather than queued without
+    bound if the disk cannot keep up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.pending_bytes = 0
+
+    def submit(self, job, size: int = 0) -> bool:
+        """Queue job() for the writer thread. Returns False if it was dropped."""
+        with self._lock:
+            if size and self.pending_bytes + size > MAX_PENDING_BYTES:
+                return False
+            self.pending_bytes += size
+            if self._pid != os.getpid():
+                # Not started yet, or this is a forked worker: threads do not survive fork
+                self._queue = queue.SimpleQueue()
+                self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+            self._queue.put((job, size))
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Finish queued jobs and stop the thread."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._pid = None
+
+    def _run(self):
+        jobs = self._queue
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            job, size = item
+            try:
+                job()
+            except Exception as e:
+                logger.warning("⚠️  Recording write failed: %s", e, extra={"event": "recording_error"})
+            finally:
+                if size:
+                    with self._lock:
+                        self.pending_bytes -= size
+
+
+WRITER = RecordingWriter()
+atexit.register(WRITER.stop)
+
+
+class SessionRecorder:
+    """Records one call into its own directory through the shared writer."""
+
+    def __init__(self, directory: str, session_id: str, writer: RecordingWriter = WRITER):
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, f"{stamp}-{session_id}")
+        self.session_id = session_id
+        self.writer = writer
+        self.started = time.monotonic()
+        self.dropped_frames = 0
+        self._audio = None
+        self._events = None
+        self.writer.submit(self._open)
+
+    def start(self, audio_config: Dict[str, Any]):
+        self.event("start", session=self.session_id, audio_config=audio_config,
+                   started_at=datetime.now(timezone.utc).isoformat())
+
+    def audio(self, frame: bytes):
+        """Record an inbound Vapi audio frame."""
+        job = functools.partial(self._write_frame, time.monotonic() - self.started, frame)
+        if not self.writer.submit(job, len(frame)):
+            self.dropped_frames += 1
+
+    def event(self, event_type: str, **fields):
+        fields["t"] = time.monotonic() - self.started
+        fields["type"] = event_type
+        self.writer.submit(functools.partial(self._write_event, fields))
+
+    def close(self, stats: Dict[str, Any]):
+        self.event("end", stats=stats, dropped_frames=self.dropped_frames)
+        self.writer.submit(self._close)
+
+    # Writer thread side
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._audio = open(os.path.join(self.path, AUDIO_FILE), "wb", buffering=BUFFER_SIZE)
+        self._events = open(os.path.join(self.path, EVENTS_FILE), "w", encoding="utf-8", buffering=BUFFER_SIZE)
+
+    def _write_frame(self, t: float, frame: bytes):
+        if self._audio is not None:
+            self._audio.write(FRAME_HEADER.pack(t, len(frame)))
+            self._audio.write(frame)
+
+    def _write_event(self, event: Dict[str, Any]):
+        if self._events is not None:
+            self._events.write(codec.dumps(event) + "\n")
+
+    def _close(self):
+        for f in (self._audio, self._events):
+            if f is not None:
+                f.close()
+        self._audio = self._events = None
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, bytes]]:
+    """Yield (t, frame) for each audio frame of a recording."""
+    with open(os.path.join(path, AUDIO_FILE), "rb") as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            t, length = FRAME_HEADER.unpack(header)
+            frame = f.read(length)
+            if len(frame) < length:
+                return  # Truncated by a crash mid-write
+            yield t, frame
+
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the events of a recording in order."""
+    with open(os.path.join(path, EVENTS_FILE), encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield codec.loads(line)
+            except codec.DecodeError:
+                return  # Truncated by a crash mid-write
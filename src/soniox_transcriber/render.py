@@ -0,0 +1,201 @@
+"""
+Transcript rendering for the console transcriber
+Turns Soniox tokens into text with speaker and language tags, and draws it on
+the terminal. Kept free of audio and network imports so it can be benchmarked
+on its own.
+"""
+import os
+import shutil
+import sys
+import time
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from soniox_transcriber.codec import Token
+
+RenderState = Tuple[Optional[str], Optional[str]]  # Speaker and language in effect
+
+
+def render_from(tokens: Iterable[Token], state: RenderState = (None, None)) -> Tuple[str, RenderState]:
+    """Render tokens following text that ended in `state`; return the text and the new state."""
+    text_parts: List[str] = []
+    current_speaker, current_language = state
+
+    for token in tokens:
+        text = token.text
+        speaker = token.speaker
+        language = token.language
+
+        # Speaker changed -> add a speaker tag
+        if speaker is not None and speaker != current_speaker:
+            if current_speaker is not None:
+                text_parts.append("\n\n")
+            current_speaker = speaker
+            current_language = None
+            text_parts.append(f"Speaker {current_speaker}:")
+
+        # Language changed -> add a language tag
+        if language is not None and language != current_language:
+            current_language = language
+            text_parts.append(f"\n[{current_language}] ")
+            text = text.lstrip()
+
+        text_parts.append(text)
+
+    return "".join(text_parts), (current_speaker, current_language)
+
+
+class TranscriptRenderer:
+    """Incremental transcript rendering.
+
+    The finalized part of the transcript is rendered once and cached, with
+    the speaker and language in effect at its end. Each update renders only
+    the newly finalized tokens and the current non-final ones, so its cost
+    does not grow with the length of the session.
+
+    With keep_text=False the finalized text is not accumulated at all (a
+    caller that writes each finalized piece out, like the console, never
+    reads it back), so memory stays constant in long sessions.
+    """
+
+    def __init__(self, keep_text: bool = True):
+        self.keep_text = keep_text
+        self.final_text = ""  # Stays empty without keep_text
+        self.final_state: RenderState = (None, None)
+        self.tail = ""  # Rendered non-final tokens
+
+    def update(self, new_final_tokens: List[Token], non_final_tokens: List[Token]) -> str:
+        """Apply one response's tokens and return the text they finalized."""
+        finalized = ""
+        if new_final_tokens:
+            finalized, self.final_state = render_from(new_final_tokens, self.final_state)
+            if self.keep_text:
+                self.final_text += finalized
+        self.tail, _ = render_from(non_final_tokens, self.final_state)
+        return finalized
+
+    @property
+    def text(self) -> str:
+        """The transcript: finalized text (if kept) followed by the non-final tail."""
+        return self.final_text + self.tail
+
+
+def _cursor(column: int, text: str, width: int) -> Tuple[int, int]:
+    """Row and column of the cursor after writing text from logical `column` at terminal width.
+
+    A line filling its last row exactly leaves the cursor in the terminal's
+    pending-wrap state: reported as column == width on that row.
+    """
+    row = 0
+    lines = text.split("\n")
+    for line in lines[:-1]:
+        column += len(line)
+        row += max(1, -(-column // width))
+        column = 0
+    column += len(lines[-1])
+    if column and column % width == 0:
+        return row + column // width - 1, width
+    return row + column // width, column % width
+
+
+class TerminalDisplay:
+    """Live transcript on a terminal, redrawn at most max_fps times a second.
+
+    Finalized text is written once and never touched again. Only the
+    non-final tail (the last few words, spanning lines when a speaker or
+    language tag appears) is redrawn: a frame moves the cursor back to where
+    the new tail first differs from what is on screen, clears from there and
+    writes the rest, all in one write. Wrapped lines are accounted for using
+    the terminal width. When the stream is not a terminal, only finalized
+    text is written.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, max_fps: float = 20.0, clock=time.monotonic):
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self.interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.clock = clock
+        self.pending = ""  # Finalized text not on screen yet
+        self.tail = ""  # Non-final text to show
+        self.shown = ""  # Non-final text on screen
+        self.column = 0  # Logical column where the shown tail starts
+        self.last_char = ""  # Last finalized character on screen
+        self.dirty = False
+        self.last_frame = float("-inf")
+        self.frames = 0
+        self.bytes_written = 0
+
+    def update(self, finalized: str, tail: str):
+        """Show newly finalized text and the current non-final tail, now or at the next frame."""
+        self.pending += finalized
+        self.tail = tail
+        self.dirty = bool(self.pending) or (self.interactive and tail != self.shown)
+        if self.dirty and self.clock() - self.last_frame >= self.interval:
+            self.flush()
+
+    def timeout(self) -> Optional[float]:
+        """Seconds until a deferred frame is due; None when the screen is up to date."""
+        if not self.dirty:
+            return None
+        return max(0.0, self.last_frame + self.interval - self.clock())
+
+    def flush(self):
+        """Draw a frame now if anything changed."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.last_frame = self.clock()
+
+        finalized = self.pending
+        out = self._redraw(finalized + self.tail) if self.interactive else finalized
+        if finalized:
+            line_break = finalized.rfind("\n")
+            self.column = len(finalized) - line_break - 1 if line_break >= 0 else self.column + len(finalized)
+            self.last_char = finalized[-1]
+            self.pending = ""
+        self.shown = self.tail if self.interactive else ""
+
+        if out:
+            self.stream.write(out)
+            self.stream.flush()
+            self.frames += 1
+            self.bytes_written += len(out)
+
+    def close(self):
+        """Draw the last frame and end the line."""
+        self.flush()
+        if self.column or self.shown:
+            self.stream.write("\n")
+            self.stream.flush()
+        self.column = 0
+        self.shown = ""
+
+    def _redraw(self, text: str) -> str:
+        """Escape sequence and text turning the shown tail into `text`."""
+        shown = self.shown
+        same = len(os.path.commonprefix([shown, text]))
+        if same == len(shown):
+            return text[same:]  # Pure append: nothing to erase
+
+        width = shutil.get_terminal_size().columns
+        row, column = _cursor(self.column, shown[:same], width)
+        while column == width and same:
+            # Cannot park the cursor in the pending-wrap state; redraw one more character
+            same -= 1
+            row, column = _cursor(self.column, shown[:same], width)
+        restore = ""
+        if column == width:
+            # The tail starts right after a full row: rewrite the finalized character ending it
+            column -= 1
+            restore = self.last_char
+
+        end_row, _ = _cursor(self.column, shown, width)
+        parts = []
+        if end_row > row:
+            parts.append(f"\x1b[{end_row - row}A")
+        parts.append("\r")
+        if column:
+            parts.append(f"\x1b[{column}C")
+        parts.append("\x1b[J")
+        parts.append(restore)
+        parts.append(text[same:])
+        return "".join(parts)
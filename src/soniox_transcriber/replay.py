@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded Vapi call
+Feeds a recording made with VAPI_RECORD_DIR back through the Vapi server, at
+1x or Nx real time. Soniox is replaced by a local stub that answers with the
+responses recorded for the call at their recorded times, so production
+traffic can be reproduced, profiled and benchmarked offline.
+
+    soniox-vapi-replay recordings/20250101-120000-0a24ff7c65dc --speed 4
+    python -m cProfile -o replay.prof -m soniox_transcriber.replay <recording>
+
+Server settings come from the environment (or --env NAME=VALUE), as for
+soniox-vapi-server. In split channel mode each upstream connection gets the
+recorded stream of its channel role.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Package modules read their settings from the environment when imported, so
+# they are imported lazily, once main() has applied --env
+
+
+class Recording:
+    """A recorded call loaded into memory."""
+
+    def __init__(self, path: str):
+        from soniox_transcriber.recorder import read_events, read_frames
+
+        self.path = path
+        self.audio_config: Dict = {}
+        self.responses: Dict[str, List[Tuple[float, str]]] = {}
+        self.stats: Dict = {}
+        for event in read_events(path):
+            if event["type"] == "start":
+                self.audio_config = event["audio_config"]
+            elif event["type"] == "response":
+                self.responses.setdefault(event["stream"], []).append((event["t"], event["message"]))
+            elif event["type"] == "end":
+                self.stats = event.get("stats", {})
+        self.frames = list(read_frames(path))
+
+    @property
+    def duration(self) -> float:
+        return self.frames[-1][0] if self.frames else 0.0
+
+
+class ReplayStub:
+    """Soniox stand-in answering each stream with its recorded responses.
+
+    Connections are matched to recorded streams by the stream role at the end
+    of their config's client_reference_id, so split-mode channels opened
+    concurrently (or taken from the pool) never swap recordings. A response
+    recorded at t is sent once the replay clock reaches t / speed. When the
+    server sends end-of-audio, everything left is sent at once.
+    """
+
+    def __init__(self, recording: Recording, speed: float, stream_order: List[str]):
+        self.recording = recording
+        self.speed = speed
+        self.pending_streams = [s for s in stream_order if s in recording.responses]
+        self.pending_streams += [s for s in recording.responses if s not in self.pending_streams]
+        self.started_at = 0.0  # Set when the replay starts
+        self.bytes_received = 0
+
+    async def handler(self, ws):
+        from soniox_transcriber import codec
+
+        try:
+            config = codec.loads(await ws.recv())
+        except Exception:
+            return  # Pooled connection closed before use
+        stream = str(config.get("client_reference_id", "")).rpartition(":")[2]
+        if not stream and self.pending_streams:
+            stream = self.pending_streams[0]  # Untagged client: next stream in order
+        if stream not in self.pending_streams:
+            return  # Unknown stream, or already replayed (a reconnect)
+        self.pending_streams.remove(stream)
+        responses = self.recording.responses[stream]
+
+        ended = asyncio.Event()
+        sender = asyncio.create_task(self.send_responses(ws, responses, ended))
+        try:
+            async for message in ws:
+                if isinstance(message, bytes):
+                    self.bytes_received += len(message)
+                elif message == "":
+                    ended.set()
+            await sender
+        finally:
+            sender.cancel()
+
+    async def send_responses(self, ws, responses: List[Tuple[float, str]], ended: asyncio.Event):
+        for t, message in responses:
+            delay = self.started_at + t / self.speed - time.monotonic()
+            if delay > 0 and not ended.is_set():
+                try:
+                    await asyncio.wait_for(ended.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            await ws.send(message)
+
+
+async def replay(recording: Recording, speed: float, linger: float, quiet: bool) -> Dict:
+    import aiohttp
+    from aiohttp import web
+    from websockets.asyncio.server import serve
+
+    from soniox_transcriber import codec, vapi_server
+
+    os.environ.setdefault("SONIOX_API_KEY", "replay")
+    vapi_server.RECORD_DIR = ""  # Never record the replay itself
+    stub = ReplayStub(recording, speed, vapi_server.CHANNEL_ROLES)
+    stub_server = await serve(stub.handler, "127.0.0.1", 0)
+    vapi_server.SONIOX_WEBSOCKET_URL = f"ws://127.0.0.1:{stub_server.sockets[0].getsockname()[1]}"
+
+    runner = web.AppRunner(vapi_server.create_app())
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    site = web.SockSite(runner, sock)
+    await site.start()
+
+    transcripts = []
+    cpu_started = time.process_time()
+    async with aiohttp.ClientSession() as http:
+        async with http.ws_connect(f"http://127.0.0.1:{port}/api/custom-transcriber") as ws:
+            async def read_transcripts():
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        data = codec.loads(msg.data)
+                        transcripts.append(((time.monotonic() - stub.started_at) * speed, data))
+                        if not quiet:
+                            print(f"[{transcripts[-1][0]:8.2f}s] {data.get('channel')}: {data.get('transcription')}")
+
+            reader = asyncio.create_task(read_transcripts())
+            stub.started_at = time.monotonic()
+            await ws.send_str(codec.dumps({"type": "start", **recording.audio_config}))
+            for t, frame in recording.frames:
+                delay = stub.started_at + t / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await ws.send_bytes(frame)
+            # Like Vapi, stay on the line briefly for the last transcripts
+            await asyncio.sleep(linger / speed)
+            await ws.close()
+            await reader
+
+    result = {
+        "call_seconds": round(recording.duration, 2),
+        "replay_seconds": round(time.monotonic() - stub.started_at, 2),
+        "process_cpu_seconds": round(time.process_time() - cpu_started, 3),
+        "transcripts": sum(1 for _, t in transcripts if t.get("transcriptType", "final") == "final"),
+        "upstream_bytes": stub.bytes_received,
+    }
+    await runner.cleanup()
+    stub_server.close()
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a recorded Vapi call against a local Soniox stub")
+    parser.add_argument("recording", help="Recording directory (under VAPI_RECORD_DIR)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiple (default: 1)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Server setting for this replay (repeatable)")
+    parser.add_argument("--linger", type=float, default=1.0,
+                        help="Call seconds to keep the call open after the last frame (default: 1)")
+    parser.add_argument("--quiet", action="store_true", help="Do not print transcripts")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.speed <= 0:
+        sys.exit("--speed must be positive")
+    for item in args.env:
+        name, _, value = item.partition("=")
+        os.environ[name] = value
+
+    recording = Recording(args.recording)
+    print(f"▶️  Replaying {recording.path}: {recording.duration:.1f}s, {recording.audio_config} at {args.speed:g}x")
+
+    from soniox_transcriber.log import setup_logging, stop_logging
+    setup_logging()
+    result = asyncio.run(replay(recording, args.speed, args.linger, args.quiet))
+    stop_logging()
+
+    recorded = recording.stats
+    print("\n📊 Replay summary")
+    for key, value in result.items():
+        print(f"   {key}: {value}")
+    if recorded:
+        print(f"   recorded session stats: {recorded}")
+
+
+if __name__ == "__main__":
+    main()
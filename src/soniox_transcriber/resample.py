@@ -0,0 +1,130 @@
+"""
+Sample rate and channel conversion for the Vapi server
+Streaming polyphase resampling and downmixing with numpy, so calls can be
+sent to Soniox at a lower rate or channel count than Vapi delivers them.
+"""
+import time
+from math import gcd
+
+from soniox_transcriber.audio import SAMPLE_WIDTH
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # Optional; conversion is unavailable without it
+    np = None
+
+# Anti-aliasing filter: windowed sinc spanning this many zero crossings on each
+# side, with its passband edge at this fraction of the lower Nyquist frequency
+ZERO_CROSSINGS = 16
+CUTOFF = 0.9
+KAISER_BETA = 8.0
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler for one float32 signal.
+
+    The input history the filter needs is kept between calls, so audio can be
+    fed in frames of any size and the output matches converting the whole
+    signal at once. Each output sample is one dot product with the filter
+    phase it falls on; all outputs of a frame are computed in one einsum.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int):
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+
+        widest = max(self.up, self.down)
+        taps = 2 * ZERO_CROSSINGS * widest + 1
+        cutoff = CUTOFF * 0.5 / widest  # Cycles per sample at the upsampled rate
+        t = np.arange(taps) - (taps - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(taps, KAISER_BETA) * self.up
+
+        # phases[p, k] = h[k * up + p], reversed along k to line up with input windows
+        self.phase_taps = -(-taps // self.up)
+        h = np.concatenate([h, np.zeros(self.phase_taps * self.up - taps)])
+        self.phases = np.ascontiguousarray(h.reshape(self.phase_taps, self.up).T[:, ::-1], dtype=np.float32)
+
+        # Group delay of the filter, the latency it adds
+        self.delay_ms = (taps - 1) / 2 / (input_rate * self.up) * 1000
+
+        self.history = np.zeros(self.phase_taps - 1, dtype=np.float32)
+        self.consumed = 0  # Input samples seen
+        self.produced = 0  # Output samples returned
+
+    def process(self, samples: "np.ndarray") -> "np.ndarray":
+        """Resample the next block of input, returning every output it completes."""
+        total = self.consumed + len(samples)
+        end = (total * self.up - 1) // self.down + 1 if total else 0
+
+        # Newest input sample and filter phase of each output sample
+        n = np.arange(self.produced, end, dtype=np.int64)
+        newest = n * self.down // self.up - self.consumed
+        phase = n * self.down % self.up
+
+        padded = np.concatenate([self.history, samples])
+        windows = sliding_window_view(padded, self.phase_taps)[newest]
+        output = np.einsum("ij,ij->i", windows, self.phases[phase])
+
+        if self.phase_taps > 1:
+            self.history = padded[len(padded) - self.phase_taps + 1:]
+        self.consumed = total
+        self.produced = end
+        return output
+
+
+class AudioConverter:
+    """Downmixes and/or resamples interleaved linear16 audio, frame by frame.
+
+    A trailing partial sample frame is carried over to the next call. The
+    time spent converting is tracked so its cost can be reported per stream.
+    """
+
+    def __init__(self, input_rate: int, input_channels: int, output_rate: int, downmix: bool):
+        if np is None:
+            raise RuntimeError("Audio conversion requires numpy (pip install numpy)")
+        self.input_rate = input_rate
+        self.input_channels = input_channels
+        self.output_rate = output_rate
+        self.output_channels = 1 if downmix else input_channels
+        self.downmix = downmix and input_channels > 1
+        self.frame_width = input_channels * SAMPLE_WIDTH
+        self.resamplers = []
+        if output_rate != input_rate:
+            self.resamplers = [PolyphaseResampler(input_rate, output_rate) for _ in range(self.output_channels)]
+        self.delay_ms = self.resamplers[0].delay_ms if self.resamplers else 0.0
+        self._carry = b""
+
+        # Cost accounting
+        self.frames = 0
+        self.busy_seconds = 0.0
+        self.audio_seconds = 0.0
+
+    @property
+    def cpu_percent(self) -> float:
+        """Conversion time as a share of the audio duration converted."""
+        return self.busy_seconds / self.audio_seconds * 100 if self.audio_seconds else 0.0
+
+    def convert(self, frame) -> bytes:
+        started = time.perf_counter()
+        if self._carry:
+            frame = self._carry + bytes(frame)
+            self._carry = b""
+        usable = len(frame) - len(frame) % self.frame_width
+        if usable != len(frame):
+            self._carry = bytes(frame[usable:])
+
+        samples = np.frombuffer(frame, dtype="<i2", count=usable // SAMPLE_WIDTH).astype(np.float32)
+        samples = samples.reshape(-1, self.input_channels)
+        if self.downmix:
+            samples = samples.mean(axis=1, keepdims=True)
+        if self.resamplers:
+            samples = np.stack(
+                [resampler.process(samples[:, ch]) for ch, resampler in enumerate(self.resamplers)], axis=1)
+        output = np.clip(np.rint(samples), -32768, 32767).astype("<i2").tobytes()
+
+        self.frames += 1
+        self.audio_seconds += usable / self.frame_width / self.input_rate
+        self.busy_seconds += time.perf_counter() - started
+        return output
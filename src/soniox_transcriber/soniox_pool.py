@@ -0,0 +1,140 @@
+"""
+Pre-warmed Soniox WebSocket connection pool
+Keeps upstream sockets open ahead of time so a new call skips the
+DNS + TCP + TLS + WebSocket handshake before its first transcript.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from websockets.asyncio.client import connect as ws_connect
+from websockets.protocol import State
+
+from soniox_transcriber.log import get_logger
+
+logger = get_logger("soniox_transcriber.soniox_pool")
+
+
+class SonioxConnectionPool:
+    """Pool of idle, already-handshaken Soniox WebSocket connections.
+
+    A connection is handed out at most once: Soniox binds a socket to the
+    configuration sent as its first message, so checked-out connections are
+    never returned to the pool.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        size: int = 2,
+        max_idle_age: float = 20.0,
+        refill_rate: float = 2.0,
+    ):
+        self.url = url
+        self.size = size
+        self.max_idle_age = max_idle_age
+        self.refill_rate = refill_rate  # New connections per second
+        self._idle: Deque[Tuple[float, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._refill_task: Optional[asyncio.Task] = None
+
+        # Exported counters
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.connect_errors = 0
+
+    async def start(self):
+        """Start filling the pool in the background."""
+        if self.size > 0 and self._refill_task is None:
+            self._refill_task = asyncio.create_task(self._refill_loop())
+
+    async def close(self):
+        """Stop refilling and close all idle connections."""
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+        while self._idle:
+            _, ws = self._idle.popleft()
+            await self._discard(ws)
+
+    async def acquire(self):
+        """Check out an open connection, falling back to a fresh connect."""
+        now = time.monotonic()
+        while self._idle:
+            opened_at, ws = self._idle.popleft()
+            if self._is_usable(opened_at, ws, now):
+                self.hits += 1
+                self._wakeup.set()
+                return ws
+            self.expired += 1
+            asyncio.create_task(self._discard(ws))
+
+        self.misses += 1
+        self._wakeup.set()
+        return await ws_connect(self.url)
+
+    def stats(self) -> Dict[str, int]:
+        """Return pool counters for health/metrics endpoints."""
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "connect_errors": self.connect_errors,
+        }
+
+    def _is_usable(self, opened_at: float, ws, now: float) -> bool:
+        return now - opened_at <= self.max_idle_age and ws.state is State.OPEN
+
+    def _prune(self):
+        """Drop connections that are too old or were closed by the server."""
+        now = time.monotonic()
+        for _ in range(len(self._idle)):
+            opened_at, ws = self._idle.popleft()
+            if self._is_usable(opened_at, ws, now):
+                self._idle.append((opened_at, ws))
+            else:
+                self.expired += 1
+                asyncio.create_task(self._discard(ws))
+
+    async def _refill_loop(self):
+        """Open connections until the pool is full, at most refill_rate per second."""
+        interval = 1.0 / self.refill_rate if self.refill_rate > 0 else 1.0
+
+        while True:
+            self._prune()
+
+            if len(self._idle) < self.size:
+                try:
+                    ws = await ws_connect(self.url)
+                    self._idle.append((time.monotonic(), ws))
+                except Exception as e:
+                    self.connect_errors += 1
+                    logger.warning("⚠️  Error pre-connecting to Soniox: %s", e,
+                                   extra={"event": "pool_connect_error"})
+                await asyncio.sleep(interval)
+                continue
+
+            # Pool is full - sleep until a checkout or the oldest connection expires
+            oldest = self._idle[0][0]
+            timeout = max(oldest + self.max_idle_age - time.monotonic(), 0.0)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    async def _discard(ws):
+        try:
+            await ws.close()
+        except Exception:
+            pass
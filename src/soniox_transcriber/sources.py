@@ -0,0 +1,223 @@
+"""
+Audio sources for the console transcriber
+A source produces pcm_s16le audio as an async iterator of chunks for
+engine.TranscriptionEngine: the microphone, a WAV or raw PCM file, standard
+input (e.g. piped from ffmpeg), or any of these paced at a multiple of real
+time. Unpaced file and stdin sources go as fast as the connection accepts.
+
+    soniox-transcriber --file meeting.wav --speed 4
+    ffmpeg -i talk.mp3 -f s16le -ac 1 -ar 16000 - | soniox-transcriber --stdin
+"""
+import asyncio
+import sys
+import threading
+import wave
+from typing import AsyncIterator, BinaryIO, Optional
+
+from soniox_transcriber.audio import SAMPLE_WIDTH
+from soniox_transcriber.capture import AudioCapture
+
+CHUNK_MS = 100  # Audio per message from file and stdin sources
+STDIN_QUEUE_CHUNKS = 50  # Chunks read ahead from stdin
+
+
+class AudioSource:
+    """Where a session's audio comes from: pcm_s16le at `rate` Hz with `channels` channels."""
+
+    name = "audio"
+    live = False  # True for real-time capture (the microphone)
+
+    def __init__(self, rate: int = 16000, channels: int = 1):
+        self.rate = rate
+        self.channels = channels
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.rate * self.channels * SAMPLE_WIDTH
+
+    def chunk_bytes(self, chunk_ms: int) -> int:
+        return self.rate * chunk_ms // 1000 * self.channels * SAMPLE_WIDTH
+
+    def start(self):
+        """Start producing audio (before connecting, so none is lost)."""
+
+    def frames(self) -> AsyncIterator[bytes]:
+        """Audio chunks until the source is exhausted."""
+        raise NotImplementedError
+
+    def stop(self):
+        """Release the source."""
+
+    def summary(self) -> str:
+        return ""
+
+
+async def captured_audio(capture: AudioCapture) -> AsyncIterator[bytes]:
+    """Yield captured audio as soon as PortAudio delivers it.
+
+    PortAudio's callback wakes the event loop through call_soon_threadsafe.
+    Audio captured before iteration starts (e.g. while connecting) comes
+    first. A gap of more than four frames between deliveries counts as an
+    underrun.
+    """
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+
+    def notify():
+        try:
+            loop.call_soon_threadsafe(ready.set)
+        except RuntimeError:
+            pass  # Loop already closed; the device is being stopped
+
+    stall = 4 * capture.frame_ms / 1000
+    capture.on_data = notify
+    ready.set()
+    last_delivery = loop.time()
+    try:
+        while True:
+            await ready.wait()
+            ready.clear()
+            data = capture.ring.read()
+            if not data:
+                continue
+            now = loop.time()
+            if now - last_delivery > stall:
+                capture.underruns += 1
+            last_delivery = now
+            yield data
+    finally:
+        capture.on_data = None
+
+
+class MicrophoneSource(AudioSource):
+    """The default input device, through capture.AudioCapture."""
+
+    name = "microphone"
+    live = True
+
+    def __init__(self, rate: int = 16000, channels: int = 1):
+        super().__init__(rate, channels)
+        self.capture = AudioCapture(rate=rate, channels=channels)
+
+    def start(self):
+        self.capture.start()
+
+    def frames(self) -> AsyncIterator[bytes]:
+        return captured_audio(self.capture)
+
+    def stop(self):
+        self.capture.stop()
+
+    def summary(self) -> str:
+        return self.capture.summary()
+
+
+class FileSource(AudioSource):
+    """A 16-bit PCM WAV file (format from its header) or a raw pcm_s16le file, read chunk by chunk."""
+
+    def __init__(self, path: str, rate: int = 16000, channels: int = 1, chunk_ms: int = CHUNK_MS):
+        self.path = self.name = path
+        self._wav: Optional[wave.Wave_read] = None
+        self._file: Optional[BinaryIO] = None
+        with open(path, "rb") as f:
+            is_wav = f.read(4) == b"RIFF"
+        if is_wav:
+            try:
+                self._wav = wave.open(path, "rb")
+            except wave.Error as e:
+                raise ValueError(f"{path}: {e}") from e
+            if self._wav.getsampwidth() != SAMPLE_WIDTH:
+                self._wav.close()
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            rate, channels = self._wav.getframerate(), self._wav.getnchannels()
+        else:
+            self._file = open(path, "rb")
+        super().__init__(rate, channels)
+        self.chunk_size = self.chunk_bytes(chunk_ms)
+
+    def _read(self) -> bytes:
+        if self._wav is not None:
+            return self._wav.readframes(self.chunk_size // (self.channels * SAMPLE_WIDTH))
+        return self._file.read(self.chunk_size)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = self._read()
+            if not chunk:
+                return
+            yield chunk
+            await asyncio.sleep(0)  # Let responses be handled between chunks
+
+    def stop(self):
+        for f in (self._wav, self._file):
+            if f is not None:
+                f.close()
+
+
+class StdinSource(AudioSource):
+    """Raw pcm_s16le from standard input, read on a daemon thread so a blocked pipe never holds up shutdown."""
+
+    name = "stdin"
+
+    def __init__(self, rate: int = 16000, channels: int = 1, chunk_ms: int = CHUNK_MS,
+                 stream: Optional[BinaryIO] = None):
+        super().__init__(rate, channels)
+        self.stream = stream or sys.stdin.buffer
+        self.chunk_size = self.chunk_bytes(chunk_ms)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue(STDIN_QUEUE_CHUNKS)
+
+        def read_stdin():
+            while True:
+                chunk = self.stream.read(self.chunk_size)
+                try:
+                    asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+                except RuntimeError:
+                    return  # Loop closed
+                if not chunk:
+                    return
+
+        threading.Thread(target=read_stdin, name="stdin-reader", daemon=True).start()
+        while True:
+            chunk = await chunks.get()
+            if not chunk:
+                return
+            yield chunk
+
+
+class PacedSource(AudioSource):
+    """Another source replayed at `speed` times real time.
+
+    Each chunk is released when it would have been fully captured, so
+    speed 1 behaves like a live microphone with chunk-sized frames.
+    """
+
+    def __init__(self, source: AudioSource, speed: float):
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+        super().__init__(source.rate, source.channels)
+        self.source = source
+        self.speed = speed
+        self.name = f"{source.name} at {speed:g}x"
+
+    def start(self):
+        self.source.start()
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        audio_bytes = 0
+        async for chunk in self.source.frames():
+            audio_bytes += len(chunk)
+            delay = started + audio_bytes / self.bytes_per_second / self.speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    def stop(self):
+        self.source.stop()
+
+    def summary(self) -> str:
+        return self.source.summary()
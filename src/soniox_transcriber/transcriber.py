@@ -1,40 +1,51 @@
 #!/usr/bin/env python3
 """
 Live Audio Transcriber for Mac using Soniox
-Captures audio from your microphone and transcribes it in real-time.
+Captures audio from your microphone and transcribes it in real-time. Audio can
+also come from a WAV/raw PCM file or stdin, paced or as fast as Soniox accepts
+(see sources.py).
 """
-import json
+import argparse
+import asyncio
+import itertools
 import os
-import threading
-import queue
 import sys
 from typing import Optional
 from dotenv import load_dotenv
 
-import pyaudio
-from websockets import ConnectionClosedOK
-from websockets.sync.client import connect
+from soniox_transcriber import engine
+from soniox_transcriber.codec import SonioxResponse, Token
+from soniox_transcriber.history import SessionHistory
+from soniox_transcriber.render import TerminalDisplay, TranscriptRenderer, render_from
+from soniox_transcriber.sources import AudioSource, FileSource, MicrophoneSource, PacedSource, StdinSource
+from soniox_transcriber.transcript import FINALIZE_MARKER
+from soniox_transcriber.vad import VoiceGate
 
 # Load environment variables
 load_dotenv()
 
-SONIOX_WEBSOCKET_URL = "wss://stt-rt.soniox.com/transcribe-websocket"
+SONIOX_WEBSOCKET_URL = engine.SONIOX_WEBSOCKET_URL
 
 # Audio recording parameters
-CHUNK_SIZE = 3840  # Number of frames per buffer
-FORMAT = pyaudio.paInt16  # 16-bit audio
 CHANNELS = 1  # Mono
 RATE = 16000  # Sample rate (16kHz)
 
+# Skip silence instead of streaming it (keepalives hold the session open)
+VAD_ENABLED = os.environ.get("SONIOX_VAD", "false").lower() in ("1", "true", "yes")
+VAD_THRESHOLD_DBFS = float(os.environ.get("SONIOX_VAD_THRESHOLD_DBFS", "-45"))
 
-def get_config(api_key: str) -> dict:
+# Maximum terminal redraws per second (0 = redraw on every response)
+DISPLAY_FPS = float(os.environ.get("SONIOX_DISPLAY_FPS", "15"))
+
+
+def get_config(api_key: str, sample_rate: int = RATE, num_channels: int = CHANNELS) -> dict:
     """Configure Soniox STT settings for live transcription."""
     config = {
         "api_key": api_key,
         "model": "stt-rt-preview",
         "audio_format": "pcm_s16le",
-        "sample_rate": RATE,
-        "num_channels": CHANNELS,
+        "sample_rate": sample_rate,
+        "num_channels": num_channels,
         "language_hints": ["en"],
         "enable_language_identification": True,
         "enable_endpoint_detection": True,
@@ -42,193 +53,129 @@ def get_config(api_key: str) -> dict:
     return config
 
 
-def capture_audio(audio_queue: queue.Queue, stop_event: threading.Event) -> None:
-    """Capture audio from microphone and put chunks into queue."""
-    p = pyaudio.PyAudio()
-
+def start_source(source: Optional[AudioSource] = None) -> Optional[AudioSource]:
+    """Start the source (default: the microphone), or print troubleshooting tips and return None."""
     try:
-        # Open audio stream
-        stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE,
-        )
-
-        print("🎤 Microphone active - start speaking...")
-
-        while not stop_event.is_set():
-            try:
-                # Read audio data
-                data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                audio_queue.put(data)
-            except Exception as e:
-                print(f"Error reading audio: {e}")
-                break
-
-        # Clean up
-        stream.stop_stream()
-        stream.close()
-
+        if source is None:
+            source = MicrophoneSource(rate=RATE, channels=CHANNELS)
+        source.start()
     except Exception as e:
         print(f"Error initializing audio: {e}")
-        print("\nTroubleshooting tips:")
-        print("- Make sure your microphone is connected and working")
-        print("- Check System Settings > Privacy & Security > Microphone")
-        print("- You may need to grant microphone permission to your terminal/Python")
-
-    finally:
-        p.terminate()
-
-
-def stream_audio_to_websocket(
-    audio_queue: queue.Queue,
-    ws,
-    stop_event: threading.Event
-) -> None:
-    """Read audio chunks from queue and send to websocket."""
+        if source is None or source.live:
+            print("\nTroubleshooting tips:")
+            print("- Make sure your microphone is connected and working")
+            print("- Check System Settings > Privacy & Security > Microphone")
+            print("- You may need to grant microphone permission to your terminal/Python")
+        return None
+
+    if source.live:
+        print("🎤 Microphone active - start speaking...")
+    else:
+        print(f"📁 Transcribing {source.name} ({source.rate} Hz, {source.channels} channel(s))")
+    return source
+
+
+def render_tokens(final_tokens: list[Token], non_final_tokens: list[Token]) -> str:
+    """Convert tokens into readable transcript (see TranscriptRenderer for live updates)."""
+    text, _ = render_from(itertools.chain(final_tokens, non_final_tokens))
+    return text
+
+
+OUTCOME_MESSAGES = {
+    engine.FINISHED: "✅ Session finished.",
+    engine.CLOSED: "✅ Connection closed.",
+    engine.INTERRUPTED: "⏹️  Stopping transcription...",
+}
+
+
+async def transcribe(api_key: str, source: Optional[AudioSource] = None) -> None:
+    """Stream and display one transcription session on a single event loop."""
+    # Start the source first (the microphone calls back on PortAudio's
+    # thread); audio produced while connecting is sent once connected
+    source = start_source(source)
+    if source is None:
+        return
+
+    gate = None
+    if VAD_ENABLED:
+        gate = VoiceGate(source.bytes_per_second / 1000, threshold_dbfs=VAD_THRESHOLD_DBFS)
+    renderer = TranscriptRenderer(keep_text=False)  # Finalized text goes straight to the display
+    display = TerminalDisplay(max_fps=DISPLAY_FPS)
+    history = SessionHistory()
+    loop = asyncio.get_running_loop()
+    redraw: Optional[asyncio.TimerHandle] = None
+
+    def flush_display():
+        nonlocal redraw
+        redraw = None
+        display.flush()
+
+    def on_connected():
+        print("✅ Connected! Transcription will appear below:")
+        print("-" * 60 + "\n")
+
+    def on_response(res: SonioxResponse) -> bool:
+        nonlocal redraw
+
+        # Check for errors
+        if res.error_code is not None:
+            display.close()
+            print(f"\n❌ Error: {res.error_code} - {res.error_message}")
+            return True
+
+        # Parse tokens
+        new_final_tokens: list[Token] = []
+        non_final_tokens: list[Token] = []
+        for token in res.tokens:
+            if token.text and token.text != FINALIZE_MARKER:
+                if token.is_final:
+                    new_final_tokens.append(token)
+                else:
+                    non_final_tokens.append(token)
+
+        # Render new text; the display coalesces redraws, drawing a deferred one on a timer
+        finalized = renderer.update(new_final_tokens, non_final_tokens)
+        if new_final_tokens:
+            history.add(new_final_tokens, finalized)
+        display.update(finalized, renderer.tail)
+        if display.dirty and redraw is None:
+            redraw = loop.call_later(display.timeout(), flush_display)
+        return False
+
+    session = engine.TranscriptionEngine(
+        get_config(api_key, source.rate, source.channels), source, on_response,
+        gate=gate, on_connected=on_connected, url=SONIOX_WEBSOCKET_URL,
+    )
     try:
-        while not stop_event.is_set():
-            try:
-                # Get audio data with timeout
-                data = audio_queue.get(timeout=0.1)
-                ws.send(data)
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Error sending audio: {e}")
-                break
-
-        # Send end-of-audio signal
-        ws.send("")
-
-    except Exception as e:
-        print(f"Error in audio streaming: {e}")
-
-
-def render_tokens(final_tokens: list[dict], non_final_tokens: list[dict]) -> str:
-    """Convert tokens into readable transcript."""
-    text_parts: list[str] = []
-    current_speaker: Optional[str] = None
-    current_language: Optional[str] = None
-
-    # Process all tokens in order
-    for token in final_tokens + non_final_tokens:
-        text = token["text"]
-        speaker = token.get("speaker")
-        language = token.get("language")
-
-        # Speaker changed -> add a speaker tag
-        if speaker is not None and speaker != current_speaker:
-            if current_speaker is not None:
-                text_parts.append("\n\n")
-            current_speaker = speaker
-            current_language = None
-            text_parts.append(f"Speaker {current_speaker}:")
-
-        # Language changed -> add a language tag
-        if language is not None and language != current_language:
-            current_language = language
-            text_parts.append(f"\n[{current_language}] ")
-            text = text.lstrip()
-
-        text_parts.append(text)
-
-    return "".join(text_parts)
-
-
-def run_live_transcription(api_key: str) -> None:
-    """Main function to run live transcription."""
-    config = get_config(api_key)
-
-    # Thread communication
-    audio_queue = queue.Queue()
-    stop_event = threading.Event()
-
+        outcome = await session.run()
+        display.close()
+        if outcome in OUTCOME_MESSAGES:
+            print("\n" + OUTCOME_MESSAGES[outcome])
+    finally:
+        source.stop()
+        if redraw is not None:
+            redraw.cancel()
+        display.close()
+        if gate is not None:
+            print(f"\n🔇 Silence skipped: {gate.suppressed_fraction:.0%} of the audio")
+        history.close()
+        print("\n" + history.report())
+        if source.summary():
+            print(source.summary())
+        if not source.live and session.send_seconds:
+            print(f"📤 Sent {session.audio_seconds:.1f}s of audio in {session.send_seconds:.1f}s "
+                  f"({session.audio_seconds / session.send_seconds:.1f}x real time)")
+
+
+def run_live_transcription(api_key: str, source: Optional[AudioSource] = None) -> None:
+    """Main function to run live transcription from `source` (default: the microphone)."""
     print("\n" + "=" * 60)
     print("🎙️  SONIOX LIVE TRANSCRIBER")
     print("=" * 60)
     print("\nConnecting to Soniox...")
 
     try:
-        with connect(SONIOX_WEBSOCKET_URL) as ws:
-            # Send configuration
-            ws.send(json.dumps(config))
-
-            # Start audio capture thread
-            capture_thread = threading.Thread(
-                target=capture_audio,
-                args=(audio_queue, stop_event),
-                daemon=True,
-            )
-            capture_thread.start()
-
-            # Start audio streaming thread
-            streaming_thread = threading.Thread(
-                target=stream_audio_to_websocket,
-                args=(audio_queue, ws, stop_event),
-                daemon=True,
-            )
-            streaming_thread.start()
-
-            print("✅ Connected! Transcription will appear below:")
-            print("-" * 60 + "\n")
-
-            final_tokens: list[dict] = []
-
-            try:
-                while True:
-                    # Receive transcription results
-                    message = ws.recv()
-                    res = json.loads(message)
-
-                    # Check for errors
-                    if res.get("error_code") is not None:
-                        print(
-                            f"\n❌ Error: {res['error_code']} - {res['error_message']}")
-                        break
-
-                    # Parse tokens
-                    non_final_tokens: list[dict] = []
-                    for token in res.get("tokens", []):
-                        if token.get("text"):
-                            if token.get("is_final"):
-                                final_tokens.append(token)
-                            else:
-                                non_final_tokens.append(token)
-
-                    # Clear previous line and render new transcript
-                    if final_tokens or non_final_tokens:
-                        # Move cursor up if we have non-final tokens to update
-                        if non_final_tokens:
-                            print("\r" + " " * 80 + "\r", end="")
-
-                        # Render and print transcript
-                        text = render_tokens(final_tokens, non_final_tokens)
-                        if non_final_tokens:
-                            # Print non-final tokens without newline
-                            print(text, end="", flush=True)
-                        else:
-                            # Print final tokens with newline
-                            print(text)
-
-                    # Check if session finished
-                    if res.get("finished"):
-                        print("\n\n✅ Session finished.")
-                        break
-
-            except ConnectionClosedOK:
-                print("\n\n✅ Connection closed.")
-
-            except KeyboardInterrupt:
-                print("\n\n⏹️  Stopping transcription...")
-
-            finally:
-                # Stop threads
-                stop_event.set()
-                capture_thread.join(timeout=2)
-                streaming_thread.join(timeout=2)
+        asyncio.run(transcribe(api_key, source))
 
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -243,8 +190,38 @@ def run_live_transcription(api_key: str) -> None:
         print("=" * 60 + "\n")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Transcribe the microphone, an audio file or stdin with Soniox")
+    inputs = parser.add_mutually_exclusive_group()
+    inputs.add_argument("--file", help="WAV (16-bit PCM) or raw pcm_s16le file to transcribe")
+    inputs.add_argument("--stdin", action="store_true",
+                        help="Read raw pcm_s16le audio from standard input (e.g. ffmpeg -f s16le -)")
+    parser.add_argument("--rate", type=int, default=RATE, help="Sample rate of raw audio (default: 16000)")
+    parser.add_argument("--channels", type=int, default=CHANNELS, help="Channels of raw audio (default: 1)")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="Send file/stdin audio at this multiple of real time; 0 = as fast as "
+                             "the connection accepts (default: 1 for files, 0 for stdin)")
+    return parser.parse_args()
+
+
+def create_source(args) -> Optional[AudioSource]:
+    """The audio source requested on the command line; None for the microphone."""
+    if args.file:
+        source: AudioSource = FileSource(args.file, rate=args.rate, channels=args.channels)
+        speed = 1.0 if args.speed is None else args.speed
+    elif args.stdin:
+        source = StdinSource(rate=args.rate, channels=args.channels)
+        speed = args.speed or 0.0
+    else:
+        return None
+    if speed < 0:
+        raise ValueError("--speed must not be negative")
+    return PacedSource(source, speed) if speed else source
+
+
 def main():
     """Entry point for the live transcriber."""
+    args = parse_args()
     # Get API key from environment
     api_key = os.environ.get("SONIOX_API_KEY")
 
@@ -258,7 +235,13 @@ def main():
         sys.exit(1)
 
     try:
-        run_live_transcription(api_key)
+        source = create_source(args)
+    except (OSError, ValueError, EOFError) as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    try:
+        run_live_transcription(api_key, source)
     except KeyboardInterrupt:
         print("\n\nExiting...")
         sys.exit(0)
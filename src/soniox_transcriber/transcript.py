@@ -0,0 +1,139 @@
+"""
+Transcript assembly for the Vapi server
+Decides what text goes back to Vapi and when, independent of the sockets.
+"""
+from typing import List, NamedTuple, Optional, Union
+
+# Tokens Soniox emits when endpoint detection fires
+END_MARKERS = ("<end>", "<END>")
+
+# Token Soniox emits once a finalize request has been processed
+FINALIZE_MARKER = "<fin>"
+
+
+class InterimThrottle:
+    """Debounces interim (non-final) hypotheses for one Soniox stream.
+
+    At most one hypothesis is sent per interval, and only if its text differs
+    from the last one sent. A hypothesis arriving inside the interval replaces
+    any held one and becomes due when the interval ends.
+    """
+
+    __slots__ = ("interval", "pending", "last_sent", "last_sent_at", "sent", "suppressed")
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.pending: Optional[str] = None
+        self.last_sent = ""
+        self.last_sent_at = float("-inf")
+
+        # Counters for session stats
+        self.sent = 0
+        self.suppressed = 0  # Unchanged or superseded before being sent
+
+    def update(self, text: str, now: float) -> Optional[str]:
+        """Offer the latest hypothesis; return it if it should be sent now."""
+        if self.pending is not None:
+            self.suppressed += 1
+            self.pending = None
+
+        if not text:
+            return None
+        if text == self.last_sent:
+            self.suppressed += 1
+            return None
+
+        if now - self.last_sent_at >= self.interval:
+            return self._mark_sent(text, now)
+        self.pending = text
+        return None
+
+    def due_in(self, now: float) -> Optional[float]:
+        """Seconds until the held hypothesis is due, or None if nothing is held."""
+        if self.pending is None:
+            return None
+        return max(self.last_sent_at + self.interval - now, 0.0)
+
+    def take_due(self, now: float) -> Optional[str]:
+        """Return the held hypothesis if its interval has passed."""
+        if self.pending is None or now - self.last_sent_at < self.interval:
+            return None
+        text = self.pending
+        self.pending = None
+        return self._mark_sent(text, now)
+
+    def reset(self):
+        """Start a new utterance after its final transcript was sent."""
+        if self.pending is not None:
+            self.suppressed += 1
+        self.pending = None
+        self.last_sent = ""
+
+    def _mark_sent(self, text: str, now: float) -> str:
+        self.last_sent = text
+        self.last_sent_at = now
+        self.sent += 1
+        return text
+
+
+class Utterance(NamedTuple):
+    """A complete turn, ready to be sent to Vapi."""
+
+    text: str
+    speaker: Union[int, str, None]
+    start_ms: Optional[int]
+    end_ms: Optional[int]
+    tokens: int
+
+
+class UtteranceAssembler:
+    """Collects final tokens of one channel into whole utterances.
+
+    An utterance is complete when Soniox's endpoint detection emits <end>.
+    If no <end> follows within max_wait of the last final token, the
+    utterance is flushed anyway. Only the text pieces and aggregate speaker
+    and timing metadata are kept, not the token objects.
+    """
+
+    __slots__ = ("max_wait", "texts", "speaker", "start_ms", "end_ms", "last_token_at")
+
+    def __init__(self, max_wait: float):
+        self.max_wait = max_wait
+        self.texts: List[str] = []
+        self.speaker: Union[int, str, None] = None
+        self.start_ms: Optional[int] = None
+        self.end_ms: Optional[int] = None
+        self.last_token_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def text(self) -> str:
+        """Text collected so far for the current utterance."""
+        return "".join(self.texts)
+
+    def add(self, token, now: float, offset_ms: int = 0):
+        """Append a final, non-marker token; offset_ms shifts its timestamps."""
+        if not self.texts:
+            self.speaker = token.speaker
+            self.start_ms = token.start_ms + offset_ms if token.start_ms is not None else None
+        if token.end_ms is not None:
+            self.end_ms = token.end_ms + offset_ms
+        self.texts.append(token.text)
+        self.last_token_at = now
+
+    def due_in(self, now: float) -> Optional[float]:
+        """Seconds until the max-wait fallback fires, or None if nothing is pending."""
+        if not self.texts:
+            return None
+        return max(self.last_token_at + self.max_wait - now, 0.0)
+
+    def flush(self) -> Optional[Utterance]:
+        """Return the pending utterance (None if it is empty) and start a new one."""
+        if not self.texts:
+            return None
+        utterance = Utterance(self.text.strip(), self.speaker, self.start_ms, self.end_ms, len(self.texts))
+        self.texts = []
+        self.speaker = self.start_ms = self.end_ms = None
+        return utterance if utterance.text else None
@@ -0,0 +1,146 @@
+"""
+Voice activity gate
+Holds back silent stretches of linear16 audio so only audio that may contain
+speech is streamed (and billed) upstream, while keeping the session open.
+"""
+from operator import mul
+from typing import List, Optional
+
+from soniox_transcriber.audio import SAMPLE_WIDTH, AudioRingBuffer
+
+try:
+    import numpy as np
+except ImportError:  # Optional; energy is computed with builtins instead
+    np = None
+
+# Soniox control messages: keep an idle session open, and finalize pending
+# tokens without waiting for more audio (answered with a <fin> token)
+KEEPALIVE_MESSAGE = '{"type": "keepalive"}'
+FINALIZE_MESSAGE = '{"type": "finalize"}'
+
+WINDOW_MS = 10  # Energy is measured per window, so attack and hangover are this precise
+
+
+def window_powers(frame, window_samples: int) -> List[float]:
+    """Mean square sample value of each window of a linear16 frame.
+
+    Interleaved channels are measured together. A remainder shorter than a
+    window is ignored unless the frame holds less than one window.
+    """
+    count = len(frame) // SAMPLE_WIDTH
+    if not count:
+        return []
+    size = min(window_samples, count)
+    windows = count // size
+
+    if np is not None:
+        samples = np.frombuffer(frame, dtype="<i2", count=windows * size).astype(np.float32)
+        samples = samples.reshape(windows, size)
+        return (np.einsum("ij,ij->i", samples, samples) / size).tolist()
+
+    samples = memoryview(frame).cast("B")[:count * SAMPLE_WIDTH].cast("h")
+    powers = []
+    for start in range(0, windows * size, size):
+        window = samples[start:start + size]
+        # map() over the buffer runs in C
+        powers.append(sum(map(mul, window, window)) / size)
+    return powers
+
+
+class VoiceGate:
+    """Energy gate with attack and hangover for one upstream audio stream.
+
+    The gate opens once the level has stayed above threshold_dbfs for
+    attack_ms, and closes after hangover_ms below it. While closed, the most
+    recent audio is held and released when the gate opens, so word onsets
+    are not clipped. A frame is forwarded whole if any part of it is open.
+    """
+
+    __slots__ = (
+        "bytes_per_ms", "window_samples", "threshold_power", "attack_ms", "hangover_ms",
+        "keepalive_ms", "preroll", "open", "loud_ms", "quiet_ms", "idle_ms",
+        "total_bytes", "suppressed_bytes", "openings",
+    )
+
+    def __init__(
+        self,
+        bytes_per_ms: float,
+        threshold_dbfs: float = -45.0,
+        attack_ms: float = 20.0,
+        hangover_ms: float = 800.0,
+        preroll_ms: float = 300.0,
+        keepalive_ms: float = 5000.0,
+        align: int = SAMPLE_WIDTH,
+    ):
+        self.bytes_per_ms = bytes_per_ms
+        self.window_samples = max(int(bytes_per_ms * WINDOW_MS) // SAMPLE_WIDTH, 1)
+        amplitude = 32768 * 10 ** (threshold_dbfs / 20)
+        self.threshold_power = amplitude * amplitude
+        self.attack_ms = attack_ms
+        self.hangover_ms = hangover_ms
+        self.keepalive_ms = keepalive_ms
+        self.preroll = AudioRingBuffer(int(bytes_per_ms * (preroll_ms + attack_ms)), align=align)
+
+        self.open = False
+        self.loud_ms = 0.0  # Speech so far towards opening
+        self.quiet_ms = 0.0  # Silence so far towards closing
+        self.idle_ms = 0.0  # Audio held back since the last output
+
+        # Counters for session stats
+        self.total_bytes = 0
+        self.suppressed_bytes = 0  # Never forwarded
+        self.openings = 0
+
+    @property
+    def suppressed_fraction(self) -> float:
+        return self.suppressed_bytes / self.total_bytes if self.total_bytes else 0.0
+
+    def push(self, frame) -> Optional[bytes]:
+        """Return the audio to forward for this frame, or None while the gate is closed.
+
+        When the gate opens, the held audio is returned in front of the frame.
+        """
+        size = len(frame)
+        if not size:
+            return None
+        self.total_bytes += size
+
+        powers = window_powers(frame, self.window_samples)
+        step_ms = size / self.bytes_per_ms / max(len(powers), 1)
+        was_open = self.open
+        forward = was_open
+        for power in powers:
+            if power >= self.threshold_power:
+                self.quiet_ms = 0.0
+                if not self.open:
+                    self.loud_ms += step_ms
+                    if self.loud_ms >= self.attack_ms:
+                        self.open = forward = True
+                        self.openings += 1
+            else:
+                self.loud_ms = 0.0
+                if self.open:
+                    self.quiet_ms += step_ms
+                    if self.quiet_ms >= self.hangover_ms:
+                        self.open = False
+
+        if not forward:
+            self.preroll.write(frame)
+            self.suppressed_bytes += size
+            self.idle_ms += size / self.bytes_per_ms
+            return None
+
+        self.idle_ms = 0.0
+        if was_open:
+            return frame
+
+        held = self.preroll.read_all()
+        self.suppressed_bytes -= len(held)
+        return held + bytes(frame)
+
+    def keepalive_due(self) -> bool:
+        """True once per keepalive interval of audio held back."""
+        if self.idle_ms < self.keepalive_ms:
+            return False
+        self.idle_ms = 0.0
+        return True
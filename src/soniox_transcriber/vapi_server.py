@@ -3,70 +3,530 @@
 Vapi Custom Transcriber Server using Soniox
 WebSocket server that receives audio from Vapi and sends back Soniox transcriptions
 """
+import argparse
 import asyncio
-import json
 import os
+import random
 import sys
-from typing import Optional, Dict, Any
+import time
+import uuid
+from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 
-from aiohttp import web
+from aiohttp import WSCloseCode, web
 import websockets
 from websockets.asyncio.client import connect as ws_connect
+from websockets.exceptions import ConnectionClosed, ConnectionClosedOK
+
+from soniox_transcriber import codec, resample, vad
+from soniox_transcriber.admission import AdmissionController, LoadMonitor
+from soniox_transcriber.audio import (
+    FORMAT_SAMPLE_WIDTHS,
+    SAMPLE_WIDTH,
+    SONIOX_FORMATS,
+    AudioRingBuffer,
+    ChannelSplitter,
+    FrameCoalescer,
+    decode_g711,
+    peak_amplitude,
+)
+from soniox_transcriber.lifecycle import DrainState, run_app
+from soniox_transcriber.log import get_logger, json_logging_enabled, setup_logging
+from soniox_transcriber.metrics import PARSE_BUCKETS, AudioTimeline, MetricsRegistry
+from soniox_transcriber.pipeline import OVERFLOW_POLICIES, AudioSendQueue
+from soniox_transcriber.recorder import SessionRecorder
+from soniox_transcriber.soniox_pool import SonioxConnectionPool
+from soniox_transcriber.transcript import END_MARKERS, FINALIZE_MARKER, InterimThrottle, UtteranceAssembler
+from soniox_transcriber.workers import WorkerSupervisor
 
 # Load environment variables
 load_dotenv()
 
 SONIOX_WEBSOCKET_URL = "wss://stt-rt.soniox.com/transcribe-websocket"
 
+# Pre-warmed upstream connection pool (set SONIOX_POOL_SIZE=0 to disable)
+POOL_SIZE = int(os.environ.get("SONIOX_POOL_SIZE", "2"))
+POOL_MAX_IDLE_AGE = float(os.environ.get("SONIOX_POOL_MAX_IDLE_AGE", "20"))
+POOL_REFILL_RATE = float(os.environ.get("SONIOX_POOL_REFILL_RATE", "2"))
+
+# "diarize" sends interleaved audio to one Soniox session and guesses speakers;
+# "split" deinterleaves stereo into one Soniox session per Vapi channel
+CHANNEL_MODE = os.environ.get("VAPI_CHANNEL_MODE", "diarize")
+CHANNEL_ROLES = os.environ.get("VAPI_CHANNEL_ROLES", "customer,assistant").split(",")
+
+# Audio held while the upstream connection is being set up, replayed on connect
+PRECONNECT_BUFFER_MS = int(os.environ.get("VAPI_PRECONNECT_BUFFER_MS", "2000"))
+PRECONNECT_BUFFER_BYTES = int(os.environ.get("VAPI_PRECONNECT_BUFFER_BYTES", str(256 * 1024)))
+
+# Bounded queue between reading audio from Vapi and sending it to Soniox.
+# Overflow policy: block, drop-oldest or drop-silence-first
+AUDIO_QUEUE_FRAMES = int(os.environ.get("VAPI_AUDIO_QUEUE_FRAMES", "200"))
+AUDIO_QUEUE_POLICY = os.environ.get("VAPI_AUDIO_QUEUE_POLICY", "drop-silence-first")
+SILENCE_PEAK = int(os.environ.get("VAPI_SILENCE_PEAK", "500"))  # linear16 amplitude
+
+# Convert audio before forwarding it to Soniox (needs numpy): resample down to
+# this rate (0 keeps Vapi's rate) and/or mix stereo down to mono. Downmixing
+# only applies to diarize mode; split mode streams are mono already
+TARGET_SAMPLE_RATE = int(os.environ.get("VAPI_TARGET_SAMPLE_RATE", "0"))
+DOWNMIX = os.environ.get("VAPI_DOWNMIX", "false").lower() in ("1", "true", "yes")
+
+# Target duration of each audio message sent to Soniox (0 forwards Vapi frames as-is)
+PACKET_MS = int(os.environ.get("VAPI_PACKET_MS", "40"))
+
+# Voice activity gate: hold back silence instead of streaming it to Soniox,
+# sending keepalives so the session stays open
+VAD_ENABLED = os.environ.get("VAPI_VAD", "false").lower() in ("1", "true", "yes")
+VAD_THRESHOLD_DBFS = float(os.environ.get("VAPI_VAD_THRESHOLD_DBFS", "-45"))
+VAD_ATTACK_MS = float(os.environ.get("VAPI_VAD_ATTACK_MS", "20"))
+VAD_HANGOVER_MS = float(os.environ.get("VAPI_VAD_HANGOVER_MS", "800"))
+VAD_KEEPALIVE_MS = float(os.environ.get("VAPI_VAD_KEEPALIVE_MS", "5000"))
+
+# Forward interim (non-final) hypotheses to Vapi, at most one per debounce interval
+INTERIM_RESULTS = os.environ.get("VAPI_INTERIM_RESULTS", "false").lower() in ("1", "true", "yes")
+INTERIM_DEBOUNCE_MS = int(os.environ.get("VAPI_INTERIM_DEBOUNCE_MS", "150"))
+
+# Final tokens are sent as one utterance when Soniox emits <end>, or after this
+# long without a new final token if no endpoint arrives
+UTTERANCE_MAX_WAIT_MS = int(os.environ.get("VAPI_UTTERANCE_MAX_WAIT_MS", "2000"))
+
+# Reconnect a dropped Soniox connection with exponential backoff and re-send
+# the last SONIOX_REPLAY_MS of audio (SONIOX_RECONNECT_ATTEMPTS=0 disables)
+RECONNECT_ATTEMPTS = int(os.environ.get("SONIOX_RECONNECT_ATTEMPTS", "5"))
+RECONNECT_BACKOFF_MS = int(os.environ.get("SONIOX_RECONNECT_BACKOFF_MS", "250"))
+RECONNECT_MAX_BACKOFF_MS = int(os.environ.get("SONIOX_RECONNECT_MAX_BACKOFF_MS", "4000"))
+REPLAY_MS = int(os.environ.get("SONIOX_REPLAY_MS", "3000"))
+
+# On SIGTERM, stop taking calls and give live ones this long to end by
+# themselves before their audio is finished from our side
+DRAIN_TIMEOUT = float(os.environ.get("VAPI_DRAIN_TIMEOUT", "120"))
+DRAIN_POLL_INTERVAL = 0.5
+
+# Max wait for Soniox's last results after the end-of-audio frame
+FINISH_TIMEOUT = 10.0
+
+# Record calls (inbound audio + Soniox responses) under this directory for
+# offline replay with soniox-vapi-replay; unset disables. RECORD_SAMPLE is the
+# fraction of calls recorded
+RECORD_DIR = os.environ.get("VAPI_RECORD_DIR", "")
+RECORD_SAMPLE = float(os.environ.get("VAPI_RECORD_SAMPLE", "1.0"))
+
+# Per-worker admission limits; new calls are refused with 503 above any of
+# them (0 disables a limit)
+MAX_SESSIONS = int(os.environ.get("VAPI_MAX_SESSIONS", "0"))
+MAX_INBOUND_KBPS = float(os.environ.get("VAPI_MAX_INBOUND_KBPS", "0"))
+MAX_LOOP_LAG_MS = float(os.environ.get("VAPI_MAX_LOOP_LAG_MS", "500"))
+
+# Application state keys
+SONIOX_POOL_KEY = web.AppKey("soniox_pool", SonioxConnectionPool)
+SESSIONS_KEY = web.AppKey("sessions", set)
+WORKER_INDEX_KEY = web.AppKey("worker_index", int)
+DRAIN_KEY = web.AppKey("drain", DrainState)
+ADMISSION_KEY = web.AppKey("admission", AdmissionController)
+
+
+logger = get_logger("soniox_transcriber.vapi_server")
+
+# Prometheus metrics (per worker process)
+METRICS = MetricsRegistry()
+ACTIVE_SESSIONS = METRICS.gauge(
+    "soniox_vapi_active_sessions", "Vapi calls currently connected")
+AUDIO_BYTES_IN = METRICS.counter(
+    "soniox_vapi_audio_received_bytes_total", "Audio bytes received from Vapi")
+AUDIO_FRAMES_IN = METRICS.counter(
+    "soniox_vapi_audio_received_frames_total", "Audio frames received from Vapi")
+AUDIO_BYTES_OUT = METRICS.counter(
+    "soniox_vapi_audio_sent_bytes_total", "Audio bytes sent to Soniox")
+AUDIO_FRAMES_OUT = METRICS.counter(
+    "soniox_vapi_audio_sent_frames_total", "Audio messages sent to Soniox")
+UPSTREAM_CONNECT_SECONDS = METRICS.histogram(
+    "soniox_vapi_upstream_connect_seconds", "Time to open a Soniox connection and send its config")
+SONIOX_PARSE_SECONDS = METRICS.histogram(
+    "soniox_vapi_soniox_parse_seconds", "Time to decode a Soniox response",
+    buckets=PARSE_BUCKETS)
+TRANSCRIPT_LATENCY_SECONDS = METRICS.histogram(
+    "soniox_vapi_transcript_latency_seconds",
+    "Time from receiving an utterance's last audio byte to sending its transcriber-response")
+PRECONNECT_BUFFERED_SECONDS = METRICS.histogram(
+    "soniox_vapi_preconnect_buffered_seconds", "Audio duration replayed after connecting to Soniox")
+PRECONNECT_DROPPED_BYTES = METRICS.counter(
+    "soniox_vapi_preconnect_dropped_bytes_total", "Audio bytes dropped before Soniox was connected")
+QUEUE_DROPPED_FRAMES = METRICS.counter(
+    "soniox_vapi_audio_queue_dropped_frames_total", "Frames dropped by the audio queue overflow policy")
+QUEUE_HIGH_WATER = METRICS.histogram(
+    "soniox_vapi_audio_queue_high_water_frames", "Per-call peak audio queue depth",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 200, 500))
+UTTERANCES_SENT = METRICS.labeled_counter(
+    "soniox_vapi_utterances_total",
+    "Final transcripts sent to Vapi by what completed them "
+    "(endpoint, finalize, timeout, speaker_change, finished)",
+    "trigger")
+UPSTREAM_RECONNECTS = METRICS.labeled_counter(
+    "soniox_vapi_upstream_reconnects_total", "Soniox reconnects after a dropped connection", "result")
+DUPLICATE_TOKENS = METRICS.counter(
+    "soniox_vapi_duplicate_tokens_total", "Tokens for replayed audio that were already transcribed")
+AUDIO_SUPPRESSED_BYTES = METRICS.counter(
+    "soniox_vapi_audio_suppressed_bytes_total", "Silent audio bytes held back by the voice activity gate")
+CONVERT_SECONDS = METRICS.histogram(
+    "soniox_vapi_audio_convert_seconds", "Time to resample/downmix one audio packet",
+    buckets=PARSE_BUCKETS)
+KEEPALIVES_SENT = METRICS.counter(
+    "soniox_vapi_keepalives_sent_total", "Keepalive messages sent to Soniox while the gate was closed")
+INTERIM_SENT = METRICS.counter(
+    "soniox_vapi_interim_sent_total", "Interim transcriber-responses sent to Vapi")
+LOOP_LAG_SECONDS = METRICS.gauge(
+    "soniox_vapi_event_loop_lag_seconds", "Smoothed event loop scheduling delay")
+INBOUND_BITRATE = METRICS.gauge(
+    "soniox_vapi_inbound_audio_kbps", "Smoothed aggregate audio bitrate received from Vapi")
+SESSIONS_REJECTED = METRICS.labeled_counter(
+    "soniox_vapi_sessions_rejected_total", "Vapi connections refused before upgrading", "reason")
+ERRORS = METRICS.labeled_counter(
+    "soniox_vapi_errors_total", "Errors by type", "type")
+
+
+class SonioxStream:
+    """A single upstream Soniox WebSocket session within a Vapi call."""
+
+    def __init__(self, channel: Optional[str] = None):
+        # Vapi channel this stream carries, or None for mixed audio (diarized)
+        self.channel = channel
+        self.ws: Optional[Any] = None
+        self.task: Optional[asyncio.Task] = None
+
+        # Upstream audio position, for transcript latency measurement. Audio
+        # counts once accepted for the stream, even if it is only sent on replay
+        self.bytes_per_ms = 0.0
+        self.audio_bytes = 0
+        self.audio_ms_sent = 0.0
+        self.timeline = AudioTimeline()
+
+        # Rate/channel conversion applied before anything else (None = as received)
+        self.converter: Optional[resample.AudioConverter] = None
+
+        # Silence gate (None unless VAPI_VAD is on). Held-back audio never
+        # reaches the stream, so positions above count forwarded audio only
+        self.gate: Optional[vad.VoiceGate] = None
+
+        # Reconnect state: recent audio for replay, where the current
+        # connection's audio starts on the stream timeline, and how far the
+        # replayed audio was already transcribed
+        self.connected = False
+        self.replay: Optional[AudioRingBuffer] = None
+        self.offset_ms = 0
+        self.last_final_end_ms = -1
+        self.replayed_until_ms = -1
+        self.retries = 0
+        self.reconnects = 0
+        self.duplicate_tokens = 0
+
+        # Final tokens waiting for the end of their utterance
+        self.utterance = UtteranceAssembler(UTTERANCE_MAX_WAIT_MS / 1000)
+
+        # Interim hypothesis debouncing (None unless VAPI_INTERIM_RESULTS is on)
+        self.interim = InterimThrottle(INTERIM_DEBOUNCE_MS / 1000) if INTERIM_RESULTS else None
+        self.interim_speaker = None
+
 
 class VapiTranscriberSession:
     """Manages a single Vapi transcription session."""
 
-    def __init__(self, vapi_ws, api_key: str):
+    def __init__(self, vapi_ws, api_key: str, pool: Optional[SonioxConnectionPool] = None):
         self.vapi_ws = vapi_ws
         self.api_key = api_key
-        self.soniox_ws: Optional[Any] = None
+        self.pool = pool
+        self.session_id = uuid.uuid4().hex[:12]
+        self.log = logger.bind(session=self.session_id)
+        self.streams: List[SonioxStream] = []
+        self.splitter: Optional[ChannelSplitter] = None
         self.audio_config: Optional[Dict] = None
+        self.connect_task: Optional[asyncio.Task] = None
+        self.forward_task: Optional[asyncio.Task] = None
         self.running = True
+        self.audio_ended = False
+        self.packets_sent = 0
+        self.recorder: Optional[SessionRecorder] = None
+
+        # Soniox audio_format of what Vapi sends and of what goes upstream, and
+        # inbound bytes per sample (negotiated from the start message)
+        self.inbound_format = "pcm_s16le"
+        self.upstream_format = "pcm_s16le"
+        self.sample_width = SAMPLE_WIDTH
 
-    def get_soniox_config(self) -> dict:
+        # Ingress -> egress hand-off, so a slow upstream never stalls reading from Vapi
+        self.audio_queue = AudioSendQueue(
+            AUDIO_QUEUE_FRAMES,
+            policy=AUDIO_QUEUE_POLICY,
+            is_silent=self.is_silent_frame,
+        )
+
+        # Pre-connect audio buffering (created once the audio format is known)
+        self.preconnect_buffer: Optional[AudioRingBuffer] = None
+        self.preconnect_arrived_at = 0.0  # When Vapi delivered the newest buffered frame
+        self.preconnect_replayed_ms = 0.0
+        self.preconnect_dropped_bytes = 0
+
+    def get_soniox_config(self, stream: SonioxStream) -> dict:
         """Build Soniox configuration based on Vapi audio settings."""
         config = {
             "api_key": self.api_key,
             "model": "stt-rt-preview",
-            "audio_format": "pcm_s16le",
+            "audio_format": self.upstream_format,
             "sample_rate": self.audio_config.get("sampleRate", 16000),
             "num_channels": self.audio_config.get("channels", 2),
             "language_hints": ["en", "ro"],  # English and Romanian
             "enable_endpoint_detection": True,
             "enable_language_identification": False,
             "enable_speaker_diarization": True,  # Enable speaker identification
+            # Tells the streams of a call apart in Soniox's logs and in recorded replays
+            "client_reference_id": f"{self.session_id}:{stream.channel or 'mixed'}",
         }
+
+        if stream.channel is not None:
+            # Channel is already known - one mono stream, no diarization needed
+            config["num_channels"] = 1
+            config["enable_speaker_diarization"] = False
+
+        if stream.converter is not None:
+            config["sample_rate"] = stream.converter.output_rate
+            config["num_channels"] = stream.converter.output_channels
+
         return config
 
+    def negotiate_encoding(self):
+        """Choose the upstream audio format for the encoding Vapi announced.
+
+        mu-law and A-law go to Soniox as received (half the bytes of linear16)
+        unless the gate or the converter needs PCM, in which case they are
+        decoded on the way.
+        """
+        encoding = str(self.audio_config.get("encoding", "linear16")).lower()
+        self.inbound_format = SONIOX_FORMATS.get(encoding)
+        if self.inbound_format is None:
+            ERRORS.inc("vapi_unsupported_encoding")
+            self.log.warning("⚠️  Unsupported encoding %r from Vapi, treating audio as linear16", encoding,
+                             extra={"event": "vapi_unsupported_encoding"})
+            self.inbound_format = "pcm_s16le"
+        self.sample_width = FORMAT_SAMPLE_WIDTHS[self.inbound_format]
+        self.upstream_format = self.inbound_format
+        if self.inbound_format == "pcm_s16le":
+            return
+
+        rate = self.audio_config.get("sampleRate", 16000)
+        channels = self.audio_config.get("channels", 2)
+        needs_pcm = (
+            VAD_ENABLED
+            or (0 < TARGET_SAMPLE_RATE < rate and resample.np is not None)
+            or (DOWNMIX and channels > 1 and not self.splits_channels())
+        )
+        if needs_pcm:
+            self.upstream_format = "pcm_s16le"
+            self.log.info("🎚️  Decoding %s audio to linear16 for the gate/converter", self.inbound_format,
+                          extra={"event": "audio_format"})
+        else:
+            self.log.info("🎚️  Sending %s audio to Soniox as received", self.inbound_format,
+                          extra={"event": "audio_format"})
+
+    def is_silent_frame(self, frame) -> bool:
+        """Whether an inbound frame is below the silence peak, for the queue's drop policy."""
+        if self.inbound_format != "pcm_s16le":
+            frame = decode_g711(frame, self.inbound_format)
+        return peak_amplitude(frame) < SILENCE_PEAK
+
+    def splits_channels(self) -> bool:
+        """Whether each Vapi channel gets its own Soniox session."""
+        return CHANNEL_MODE == "split" and self.audio_config.get("channels", 2) == len(CHANNEL_ROLES)
+
     async def connect_to_soniox(self):
-        """Establish connection to Soniox WebSocket API."""
+        """Establish connection(s) to Soniox WebSocket API."""
+        channels = self.audio_config.get("channels", 2)
+
+        if self.splits_channels():
+            # One Soniox session per Vapi channel, role known from the channel index
+            self.splitter = ChannelSplitter(channels, FORMAT_SAMPLE_WIDTHS[self.upstream_format])
+            streams = [SonioxStream(role) for role in CHANNEL_ROLES]
+        else:
+            streams = [SonioxStream()]
+        for stream in streams:
+            stream.converter = self.create_converter(stream)
+
+        results = await asyncio.gather(*(self.connect_stream(stream) for stream in streams))
+        if not all(results):
+            for stream in streams:
+                await self.close_stream(stream)
+            return False
+
+        # Replay audio that arrived while connecting in one burst, then go live.
+        # Frames received during the replay land in the buffer and are picked up
+        # by the next iteration, so ordering is preserved.
+        buffer = self.preconnect_buffer
+        replayed_bytes = 0
+        while buffer is not None and len(buffer):
+            arrived_at = self.preconnect_arrived_at
+            burst = buffer.read_all()
+            replayed_bytes += len(burst)
+            await self.send_audio(burst, streams, arrived_at)
+
+        self.streams = streams
+
+        if buffer is not None:
+            self.preconnect_replayed_ms = replayed_bytes * 1000 / self.audio_bytes_per_second()
+            self.preconnect_dropped_bytes += buffer.dropped_bytes
+            self.preconnect_buffer = None
+            PRECONNECT_BUFFERED_SECONDS.observe(self.preconnect_replayed_ms / 1000)
+            PRECONNECT_DROPPED_BYTES.inc(buffer.dropped_bytes)
+            if replayed_bytes:
+                self.log.info("⏩ Replayed %.0f ms of pre-connect audio (%d bytes dropped on overflow)",
+                              self.preconnect_replayed_ms, buffer.dropped_bytes,
+                              extra={"event": "preconnect_replayed"})
+        return True
+
+    async def open_stream(self, stream: SonioxStream) -> dict:
+        """Open a Soniox WebSocket for the stream and send its configuration."""
+        started = time.perf_counter()
+        if self.pool is not None:
+            # Reuse a pre-opened socket when one is available
+            stream.ws = await self.pool.acquire()
+        else:
+            stream.ws = await ws_connect(SONIOX_WEBSOCKET_URL)
+        config = self.get_soniox_config(stream)
+        await stream.ws.send(codec.dumps(config))
+        UPSTREAM_CONNECT_SECONDS.observe(time.perf_counter() - started)
+
+        frame_width = config["num_channels"] * FORMAT_SAMPLE_WIDTHS[config["audio_format"]]
+        stream.bytes_per_ms = config["sample_rate"] * frame_width / 1000
+        if stream.replay is None:
+            capacity = int(stream.bytes_per_ms * REPLAY_MS) if RECONNECT_ATTEMPTS > 0 else 0
+            stream.replay = AudioRingBuffer(capacity, align=frame_width)
+        if VAD_ENABLED and stream.gate is None:
+            stream.gate = vad.VoiceGate(
+                stream.bytes_per_ms,
+                threshold_dbfs=VAD_THRESHOLD_DBFS,
+                attack_ms=VAD_ATTACK_MS,
+                hangover_ms=VAD_HANGOVER_MS,
+                keepalive_ms=VAD_KEEPALIVE_MS,
+                align=config["num_channels"] * SAMPLE_WIDTH,
+            )
+        return config
+
+    async def connect_stream(self, stream: SonioxStream) -> bool:
+        """Open one Soniox WebSocket and start reading its responses."""
         try:
-            self.soniox_ws = await ws_connect(SONIOX_WEBSOCKET_URL)
-            config = self.get_soniox_config()
-            await self.soniox_ws.send(json.dumps(config))
-            print(f"✅ Connected to Soniox (sample_rate={config['sample_rate']}, channels={config['num_channels']})")
+            config = await self.open_stream(stream)
+            stream.connected = True
+            self.log.info("✅ Connected to Soniox (sample_rate=%s, channels=%s, stream=%s)",
+                          config["sample_rate"], config["num_channels"], stream.channel or "mixed",
+                          extra={"event": "soniox_connected"})
 
             # Start the response handler task NOW that we're connected
-            self.soniox_task = asyncio.create_task(self.process_soniox_responses())
+            stream.task = asyncio.create_task(self.process_soniox_responses(stream))
 
             return True
         except Exception as e:
-            print(f"❌ Error connecting to Soniox: {e}")
+            ERRORS.inc("soniox_connect")
+            self.log.error("❌ Error connecting to Soniox: %s", e, extra={"event": "soniox_connect_error"})
             return False
 
+    def create_converter(self, stream: SonioxStream) -> Optional[resample.AudioConverter]:
+        """Create the stream's rate/channel converter, or None if audio goes out as received."""
+        rate = self.audio_config.get("sampleRate", 16000)
+        channels = 1 if stream.channel is not None else self.audio_config.get("channels", 2)
+        output_rate = min(TARGET_SAMPLE_RATE, rate) if TARGET_SAMPLE_RATE > 0 else rate
+        downmix = DOWNMIX and channels > 1
+        if output_rate == rate and not downmix:
+            return None
+        if resample.np is None:
+            self.log.warning("⚠️  numpy is not installed - forwarding audio without conversion",
+                             extra={"event": "conversion_unavailable"})
+            return None
+
+        converter = resample.AudioConverter(rate, channels, output_rate, downmix)
+        self.log.info("🔄 Converting %d Hz x%d to %d Hz x%d (filter delay %.1f ms, stream=%s)",
+                      rate, channels, output_rate, converter.output_channels, converter.delay_ms,
+                      stream.channel or "mixed", extra={"event": "audio_conversion"})
+        return converter
+
+    def audio_bytes_per_second(self) -> int:
+        """Inbound audio byte rate for the announced Vapi format."""
+        rate = self.audio_config.get("sampleRate", 16000)
+        channels = self.audio_config.get("channels", 2)
+        return rate * channels * self.sample_width
+
+    def create_preconnect_buffer(self) -> AudioRingBuffer:
+        """Allocate the pre-connect buffer, capped by both bytes and duration."""
+        frame_width = self.audio_config.get("channels", 2) * self.sample_width
+        capacity = min(
+            PRECONNECT_BUFFER_BYTES,
+            self.audio_bytes_per_second() * PRECONNECT_BUFFER_MS // 1000,
+        )
+        return AudioRingBuffer(capacity, align=frame_width)
+
+    async def send_audio(self, message: bytes, streams: List[SonioxStream], arrived_at: float):
+        """Forward an inbound Vapi audio chunk to the Soniox stream(s).
+
+        arrived_at is when the newest audio in the chunk was received from Vapi.
+        """
+        self.packets_sent += 1
+        if self.upstream_format != self.inbound_format:
+            message = decode_g711(message, self.inbound_format)
+        if self.splitter is not None:
+            chunks = self.splitter.split(message)
+        else:
+            chunks = [message]
+
+        for stream, chunk in zip(streams, chunks):
+            if stream.converter is not None:
+                busy = stream.converter.busy_seconds
+                chunk = stream.converter.convert(chunk)
+                CONVERT_SECONDS.observe(stream.converter.busy_seconds - busy)
+                if not chunk:
+                    continue
+
+            finalize = False
+            if stream.gate is not None:
+                chunk = stream.gate.push(chunk)
+                if chunk is None:
+                    # Silence - only keep the session from timing out
+                    if stream.gate.keepalive_due() and await self.send_upstream(stream, vad.KEEPALIVE_MESSAGE):
+                        KEEPALIVES_SENT.inc()
+                    continue
+                # Speech just ended: finalize it now rather than when the next word arrives
+                finalize = not stream.gate.open
+
+            # Keep the last few seconds for replay after a reconnect
+            stream.replay.write(chunk)
+            stream.audio_bytes += len(chunk)
+            stream.audio_ms_sent = stream.audio_bytes / stream.bytes_per_ms
+            stream.timeline.record(stream.audio_ms_sent, arrived_at)
+
+            # Forward audio to Soniox (while reconnecting it goes out with the replay)
+            if not await self.send_upstream(stream, chunk):
+                continue
+            AUDIO_BYTES_OUT.inc(len(chunk))
+            AUDIO_FRAMES_OUT.inc()
+
+            if finalize:
+                await self.send_upstream(stream, vad.FINALIZE_MESSAGE)
+
+    async def send_upstream(self, stream: SonioxStream, data) -> bool:
+        """Send audio or a control message on a connected stream. Returns False if not sent."""
+        if not stream.connected:
+            return False
+        try:
+            await stream.ws.send(data)
+        except Exception as e:
+            # The response reader notices the drop and reconnects
+            stream.connected = False
+            ERRORS.inc("soniox_send")
+            self.log.warning("⚠️  Error sending audio to Soniox: %s", e,
+                             extra={"event": "soniox_send_error"})
+            return False
+        return True
+
     async def handle_vapi_message(self, message):
         """Process incoming message from Vapi."""
         # Handle text messages (JSON)
         if isinstance(message, str):
             try:
-                data = json.loads(message)
+                data = codec.loads(message)
                 msg_type = data.get("type")
 
                 if msg_type == "start":
@@ -77,16 +537,30 @@ class VapiTranscriberSession:
                         "sampleRate": data.get("sampleRate", 16000),
                         "channels": data.get("channels", 2),
                     }
-                    print(f"📥 Received Vapi start message: {self.audio_config}")
+                    self.log.info("📥 Received Vapi start message: %s", self.audio_config,
+                                  extra={"event": "vapi_start"})
+                    self.negotiate_encoding()
+
+                    if RECORD_DIR and random.random() < RECORD_SAMPLE:
+                        self.recorder = SessionRecorder(RECORD_DIR, self.session_id)
+                        self.recorder.start(self.audio_config)
+                        self.log.info("⏺️  Recording call to %s", self.recorder.path,
+                                      extra={"event": "recording_started"})
 
-                    # Connect to Soniox with the audio config
-                    await self.connect_to_soniox()
+                    # Connect to Soniox in the background so audio keeps being
+                    # read (and buffered) during the handshake
+                    self.preconnect_buffer = self.create_preconnect_buffer()
+                    self.connect_task = asyncio.create_task(self.connect_to_soniox())
+                    self.forward_task = asyncio.create_task(self.forward_audio())
 
                 else:
-                    print(f"⚠️  Unknown message type from Vapi: {msg_type}")
+                    self.log.warning("⚠️  Unknown message type from Vapi: %s", msg_type,
+                                     extra={"event": "vapi_unknown_message"})
 
-            except json.JSONDecodeError:
-                print(f"⚠️  Invalid JSON from Vapi: {message}")
+            except codec.DecodeError:
+                ERRORS.inc("vapi_invalid_json")
+                self.log.warning("⚠️  Invalid JSON from Vapi: %s", message,
+                                 extra={"event": "vapi_invalid_json"})
 
         # Handle binary messages (audio data)
         elif isinstance(message, bytes):
@@ -94,125 +568,471 @@ class VapiTranscriberSession:
             if not hasattr(self, '_audio_count'):
                 self._audio_count = 0
             self._audio_count += 1
+            AUDIO_FRAMES_IN.inc()
+            AUDIO_BYTES_IN.inc(len(message))
+            if self.recorder is not None:
+                self.recorder.audio(message)
 
             if self._audio_count % 100 == 0:  # Log every 100 chunks
-                print(f"🎵 Received {self._audio_count} audio chunks ({len(message)} bytes)")
+                self.log.debug("🎵 Received %d audio chunks (%d bytes)", self._audio_count, len(message),
+                               extra={"event": "audio_progress"})
 
-            if self.soniox_ws:
-                try:
-                    # Forward audio to Soniox
-                    await self.soniox_ws.send(message)
-                except Exception as e:
-                    print(f"⚠️  Error sending audio to Soniox: {e}")
+            if self.forward_task is not None:
+                await self.audio_queue.put(message)
             else:
-                print("⚠️  Received audio but Soniox not connected yet")
+                # Audio before the start message - format unknown, nothing to buffer for
+                self.preconnect_dropped_bytes += len(message)
+                self.log.warning("⚠️  Received audio before the start message, dropping it",
+                                 extra={"event": "audio_before_connect"})
 
-    async def process_soniox_responses(self):
-        """Read transcription results from Soniox and send to Vapi."""
-        if not self.soniox_ws:
+    async def forward_audio(self):
+        """Drain the audio queue and forward frames to Soniox."""
+        coalescer = self.create_coalescer()
+        flush_after = PACKET_MS / 1000
+
+        while True:
+            timeout = None
+            if coalescer is not None and coalescer.pending:
+                # Bound the latency of a partially filled packet
+                timeout = max(coalescer.pending_since + flush_after - time.monotonic(), 0.0)
+
+            message = await self.audio_queue.get(timeout)
+            if message is None:
+                if coalescer is not None:
+                    packet = coalescer.flush()
+                    if packet is not None:
+                        await self.send_audio(packet, self.streams, self.audio_queue.last_enqueued_at)
+                if self.audio_queue.closed:
+                    break
+                continue
+
+            if self.streams:
+                arrived_at = self.audio_queue.last_enqueued_at
+                if coalescer is None:
+                    await self.send_audio(message, self.streams, arrived_at)
+                else:
+                    for packet in coalescer.push(message):
+                        await self.send_audio(packet, self.streams, arrived_at)
+            elif self.preconnect_buffer is not None:
+                # Soniox still connecting - hold the audio for replay
+                self.preconnect_buffer.write(message)
+                self.preconnect_arrived_at = self.audio_queue.last_enqueued_at
+
+    def create_coalescer(self) -> Optional[FrameCoalescer]:
+        """Create the upstream packet coalescer, or None if disabled."""
+        if PACKET_MS <= 0:
+            return None
+        frame_width = self.audio_config.get("channels", 2) * self.sample_width
+        packet_bytes = self.audio_bytes_per_second() * PACKET_MS // 1000
+        return FrameCoalescer(max(packet_bytes - packet_bytes % frame_width, frame_width))
+
+    async def process_soniox_responses(self, stream: SonioxStream):
+        """Read transcription results from Soniox and send to Vapi, reconnecting on drops."""
+        if not stream.ws:
             return
 
-        print("🎧 Started listening for Soniox responses...")
+        while not await self.read_soniox_responses(stream) and self.running:
+            if not await self.reconnect_stream(stream):
+                break
+
+        # Whatever was said after the last endpoint
+        await self.flush_utterance(stream, "finished")
+
+    async def read_soniox_responses(self, stream: SonioxStream) -> bool:
+        """Handle responses on the stream's current connection.
+
+        Returns True when the stream is over (Soniox finished, reported an
+        error or closed normally, or the call ended) and False if the
+        connection dropped mid-call and should be reopened.
+        """
+        self.log.debug("🎧 Started listening for Soniox responses...", extra={"event": "soniox_listening"})
 
         try:
-            async for message in self.soniox_ws:
-                if not self.running:
-                    break
+            while self.running:
+                message = await self.receive_soniox_message(stream)
+                if message is None:
+                    # A deadline passed before Soniox said anything new
+                    now = time.monotonic()
+                    if stream.utterance.due_in(now) == 0:
+                        await self.flush_utterance(stream, "timeout")
+                    if stream.interim is not None:
+                        text = stream.interim.take_due(now)
+                        if text:
+                            await self.send_transcript(stream, text, stream.interim_speaker, final=False)
+                    continue
+                if self.recorder is not None:
+                    self.recorder.event("response", stream=stream.channel or "mixed", message=message)
 
                 try:
-                    res = json.loads(message)
+                    parse_started = time.perf_counter()
+                    res = codec.decode_response(message)
+                    SONIOX_PARSE_SECONDS.observe(time.perf_counter() - parse_started)
 
                     # Debug: Log all Soniox responses
-                    print(f"🔊 Soniox response: {res}")
+                    self.log.debug("🔊 Soniox response: %s", res, extra={"event": "soniox_response"})
 
                     # Check for errors from Soniox
-                    if res.get("error_code"):
-                        print(f"❌ Soniox error: {res['error_code']} - {res['error_message']}")
-                        continue
-
-                    # Extract final transcription tokens with speaker info
-                    final_tokens = []
-                    speaker_id = None
-                    for token in res.get("tokens", []):
-                        if token.get("is_final") and token.get("text"):
-                            final_tokens.append(token["text"])
-                            # Get speaker from token (Soniox diarization provides this)
-                            if speaker_id is None and "speaker" in token:
-                                speaker_id = token["speaker"]
-
-                    # Send transcription to Vapi if we have final tokens
-                    if final_tokens:
-                        transcription = "".join(final_tokens)
-
-                        # Remove <end> and <END> markers
-                        transcription = transcription.replace("<end>", "").replace("<END>", "").strip()
-
-                        # Skip if empty after cleanup
-                        if not transcription:
+                    if res.error_code:
+                        ERRORS.inc("soniox_error_response")
+                        self.log.error("❌ Soniox error: %s - %s", res.error_code, res.error_message,
+                                       extra={"event": "soniox_error"})
+                        # Bad key, config or quota: a reconnect would fail the same way
+                        stream.connected = False
+                        return True
+                    stream.retries = 0
+
+                    # Final tokens go to the utterance assembler; <end> completes the utterance
+                    now = time.monotonic()
+                    interim_tokens = []
+                    interim_speaker = None
+                    for token in res.tokens:
+                        if not token.text:
+                            continue
+                        if token.text in END_MARKERS:
+                            if token.is_final:
+                                await self.flush_utterance(stream, "endpoint")
+                            continue
+                        if token.text == FINALIZE_MARKER:
+                            # Answer to the gate's finalize request at the end of speech
+                            await self.flush_utterance(stream, "finalize")
                             continue
 
-                        # Determine speaker channel using Soniox speaker diarization
-                        # Soniox identifies speakers as S0, S1, S2, etc.
-                        # We need to map:
-                        # - First speaker (S0) is typically the one who speaks first
-                        # - In Vapi calls, assistant usually speaks first with firstMessage
-                        # - So S0 = assistant, S1 = customer
-                        # But this can vary, so we'll use a heuristic:
-                        # - Track which speaker spoke first
-                        if not hasattr(self, '_first_speaker'):
-                            self._first_speaker = speaker_id
-                            # Assume first speaker is the assistant (Riley's firstMessage)
-                            self._assistant_speaker = speaker_id
-                            vapi_channel = "assistant"
-                        else:
-                            # If same as first speaker, it's assistant; otherwise customer
-                            if speaker_id == self._assistant_speaker:
-                                vapi_channel = "assistant"
-                            else:
-                                vapi_channel = "customer"
-
-                        # Send to Vapi in the expected format
-                        vapi_response = {
-                            "type": "transcriber-response",
-                            "transcription": transcription,
-                            "channel": vapi_channel,
-                        }
-
-                        await self.vapi_ws.send_json(vapi_response)
-                        print(f"📤 Sent to Vapi [{vapi_channel}] (speaker: {speaker_id}): {transcription}")
+                        # Timestamps restart on every connection; map them onto the stream
+                        if token.end_ms is not None and token.end_ms + stream.offset_ms <= stream.replayed_until_ms:
+                            # Replayed audio after a reconnect, already transcribed
+                            stream.duplicate_tokens += 1
+                            DUPLICATE_TOKENS.inc()
+                            continue
+
+                        if not token.is_final:
+                            interim_tokens.append(token.text)
+                            if interim_speaker is None:
+                                interim_speaker = token.speaker
+                            continue
+
+                        # Diarized audio: a new speaker starts a new turn
+                        if (stream.channel is None and stream.utterance
+                                and token.speaker != stream.utterance.speaker):
+                            await self.flush_utterance(stream, "speaker_change")
+                        stream.utterance.add(token, now, stream.offset_ms)
+                        # Only final tokens decide which diarized speaker is the assistant
+                        self.channel_for(stream, token.speaker)
+                        if stream.utterance.end_ms is not None:
+                            stream.last_final_end_ms = stream.utterance.end_ms
+
+                    # Offer the pending utterance plus the non-final tail as the interim hypothesis
+                    if stream.interim is not None:
+                        hypothesis = (stream.utterance.text + "".join(interim_tokens)).strip()
+                        stream.interim_speaker = stream.utterance.speaker if stream.utterance else interim_speaker
+                        text = stream.interim.update(hypothesis, time.monotonic())
+                        if text:
+                            await self.send_transcript(stream, text, stream.interim_speaker, final=False)
 
                     # Check if session finished
-                    if res.get("finished"):
-                        print("✅ Soniox session finished")
-                        break
+                    if res.finished:
+                        self.log.info("✅ Soniox session finished", extra={"event": "soniox_finished"})
+                        return True
 
-                except json.JSONDecodeError:
-                    print(f"⚠️  Invalid JSON from Soniox: {message}")
+                except codec.DecodeError:
+                    ERRORS.inc("soniox_invalid_json")
+                    self.log.warning("⚠️  Invalid JSON from Soniox: %s", message,
+                                     extra={"event": "soniox_invalid_json"})
+                except ConnectionClosed:
+                    raise
                 except Exception as e:
-                    print(f"⚠️  Error processing Soniox response: {e}")
+                    ERRORS.inc("soniox_response")
+                    self.log.warning("⚠️  Error processing Soniox response: %s", e,
+                                     extra={"event": "soniox_response_error"})
 
+            return True
+
+        except ConnectionClosed as e:
+            if isinstance(e, ConnectionClosedOK) or self.audio_ended:
+                # Closed normally, or after the call's audio ended: nothing to resume
+                stream.connected = False
+                return True
+            if self.running:
+                ERRORS.inc("soniox_connection_lost")
+                self.log.warning("⚠️  Soniox connection lost: %s", e, extra={"event": "soniox_connection_lost"})
         except Exception as e:
-            print(f"⚠️  Error in Soniox response handler: {e}")
+            ERRORS.inc("soniox_receive")
+            self.log.warning("⚠️  Error in Soniox response handler: %s", e,
+                             extra={"event": "soniox_receive_error"})
 
-    async def close(self):
-        """Clean up connections."""
-        self.running = False
-        if self.soniox_ws:
+        stream.connected = False
+        return False
+
+    async def reconnect_stream(self, stream: SonioxStream) -> bool:
+        """Reopen a dropped Soniox connection with backoff and replay recent audio."""
+        stream.connected = False
+        await self.close_stream(stream)
+
+        while stream.retries < RECONNECT_ATTEMPTS:
+            delay = min(RECONNECT_BACKOFF_MS * 2 ** stream.retries, RECONNECT_MAX_BACKOFF_MS) / 1000
+            stream.retries += 1
+            self.log.info("🔁 Reconnecting to Soniox in %.2fs (attempt %d/%d)", delay, stream.retries,
+                          RECONNECT_ATTEMPTS, extra={"event": "soniox_reconnecting"})
+            await asyncio.sleep(delay)
+            if not self.running:
+                return False
+
+            try:
+                await self.open_stream(stream)
+                if not self.running:
+                    await self.close_stream(stream)
+                    return False
+                replayed_ms = await self.replay_audio(stream)
+            except Exception as e:
+                ERRORS.inc("soniox_reconnect")
+                self.log.warning("⚠️  Error reconnecting to Soniox: %s", e, extra={"event": "soniox_reconnect_error"})
+                await self.close_stream(stream)
+                continue
+
+            stream.reconnects += 1
+            UPSTREAM_RECONNECTS.inc("success")
+            if self.recorder is not None:
+                self.recorder.event("reconnect", stream=stream.channel or "mixed", replayed_ms=replayed_ms)
+            self.log.info("✅ Reconnected to Soniox, replayed %.0f ms of audio", replayed_ms,
+                          extra={"event": "soniox_reconnected"})
+            return True
+
+        UPSTREAM_RECONNECTS.inc("failure")
+        self.log.error("❌ Giving up on Soniox after %d reconnect attempts", stream.retries,
+                       extra={"event": "soniox_reconnect_failed"})
+        return False
+
+    async def replay_audio(self, stream: SonioxStream) -> float:
+        """Re-send the stream's recent audio on a fresh connection, then go live.
+
+        Returns the duration replayed in ms.
+        """
+        start = stream.audio_bytes - len(stream.replay)
+        stream.offset_ms = round(start / stream.bytes_per_ms)
+        stream.replayed_until_ms = stream.last_final_end_ms
+
+        # Audio accepted while a burst is being sent lands at the tail of the
+        # buffer and goes out with the next burst, so ordering is preserved
+        position = start
+        while position < stream.audio_bytes:
+            end = stream.audio_bytes
+            burst = stream.replay.peek(end - position)
+            position = end
+            await stream.ws.send(burst)
+            AUDIO_BYTES_OUT.inc(len(burst))
+            AUDIO_FRAMES_OUT.inc()
+
+        if self.audio_ended:
+            await stream.ws.send("")
+
+        stream.connected = True
+        return (position - start) / stream.bytes_per_ms
+
+    async def receive_soniox_message(self, stream: SonioxStream):
+        """Wait for the next Soniox message, or return None when a pending deadline passes."""
+        now = time.monotonic()
+        deadlines = [stream.utterance.due_in(now)]
+        if stream.interim is not None:
+            deadlines.append(stream.interim.due_in(now))
+        deadlines = [d for d in deadlines if d is not None]
+        if not deadlines:
+            return await stream.ws.recv()
+        try:
+            # Cancelling recv() does not lose data
+            return await asyncio.wait_for(stream.ws.recv(), timeout=min(deadlines))
+        except asyncio.TimeoutError:
+            return None
+
+    async def flush_utterance(self, stream: SonioxStream, trigger: str):
+        """Send the stream's pending utterance to Vapi as one final transcript."""
+        utterance = stream.utterance.flush()
+        if utterance is None:
+            return
+
+        if stream.interim is not None:
+            stream.interim.reset()
+        if not await self.send_transcript(stream, utterance.text, utterance.speaker, final=True):
+            return
+
+        UTTERANCES_SENT.inc(trigger)
+        if utterance.end_ms is not None:
+            arrived_at = stream.timeline.arrival_time(utterance.end_ms)
+            if arrived_at is not None:
+                TRANSCRIPT_LATENCY_SECONDS.observe(time.monotonic() - arrived_at)
+
+    def channel_for(self, stream: SonioxStream, speaker_id, assign: bool = True) -> Optional[str]:
+        """Map a transcript to the Vapi channel it belongs to.
+
+        With assign=False (interims, whose speaker labels are not stable yet)
+        the first speaker is never taken as the assistant; None is returned
+        until a final transcript has set the mapping.
+        """
+        # Determine speaker channel using Soniox speaker diarization
+        # Soniox identifies speakers as S0, S1, S2, etc.
+        # We need to map:
+        # - First speaker (S0) is typically the one who speaks first
+        # - In Vapi calls, assistant usually speaks first with firstMessage
+        # - So S0 = assistant, S1 = customer
+        # But this can vary, so we'll use a heuristic:
+        # - Track which speaker spoke first
+        if stream.channel is not None:
+            # Split mode: the channel is known, no guessing needed
+            return stream.channel
+        if not hasattr(self, '_first_speaker'):
+            if not assign:
+                return None
+            self._first_speaker = speaker_id
+            # Assume first speaker is the assistant (Riley's firstMessage)
+            self._assistant_speaker = speaker_id
+            return "assistant"
+        # If same as first speaker, it's assistant; otherwise customer
+        if speaker_id == self._assistant_speaker:
+            return "assistant"
+        return "customer"
+
+    async def send_transcript(self, stream: SonioxStream, transcription: str, speaker_id, final: bool) -> bool:
+        """Send a final or interim transcription to Vapi. Returns False if it could not be sent."""
+        if self.vapi_ws.closed:
+            # Vapi hung up - the last words have nowhere to go
+            return False
+
+        vapi_channel = self.channel_for(stream, speaker_id, assign=final)
+        if vapi_channel is None:
+            return False  # Interim before the first final: no speaker mapping yet
+
+        # Send to Vapi in the expected format
+        vapi_response = {
+            "type": "transcriber-response",
+            "transcription": transcription,
+            "channel": vapi_channel,
+        }
+        if INTERIM_RESULTS:
+            vapi_response["transcriptType"] = "final" if final else "partial"
+
+        try:
+            await self.vapi_ws.send_json(vapi_response, dumps=codec.dumps)
+        except Exception as e:
+            ERRORS.inc("vapi_send")
+            self.log.warning("⚠️  Error sending transcript to Vapi: %s", e, extra={"event": "vapi_send_error"})
+            return False
+
+        if final:
+            self.log.info("📤 Sent to Vapi [%s] (speaker: %s): %s", vapi_channel, speaker_id, transcription,
+                          extra={"event": "transcript_sent"})
+        else:
+            INTERIM_SENT.inc()
+            self.log.debug("💬 Interim to Vapi [%s]: %s", vapi_channel, transcription,
+                           extra={"event": "interim_sent"})
+        return True
+
+    async def wait_for_streams(self):
+        """Finish the audio and wait for Soniox's last results."""
+        if self.connect_task is not None:
+            await self.connect_task
+
+        # Let the forwarder send whatever Vapi delivered before hanging up
+        self.audio_queue.close()
+        if self.forward_task is not None:
+            await self.forward_task
+
+        await self.end_audio()
+
+        tasks = [stream.task for stream in self.streams if stream.task and not stream.task.done()]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=FINISH_TIMEOUT)
+            if pending:
+                self.log.warning("⚠️  Soniox did not finish within %gs", FINISH_TIMEOUT,
+                                 extra={"event": "soniox_finish_timeout"})
+
+    async def end_audio(self):
+        """Send the end-of-audio frame so Soniox finalizes and closes each stream."""
+        if self.audio_ended:
+            return
+        self.audio_ended = True
+        for stream in self.streams:
+            if not stream.connected:
+                continue  # A reconnecting stream sends it after its replay
+            try:
+                await stream.ws.send("")
+            except Exception as e:
+                self.log.warning("⚠️  Error sending end of audio to Soniox: %s", e,
+                                 extra={"event": "soniox_send_error"})
+
+    async def end(self):
+        """End the call from our side: finish transcribing, then hang up on Vapi."""
+        try:
+            await self.wait_for_streams()
+        finally:
+            await self.vapi_ws.close(code=WSCloseCode.GOING_AWAY, message=b"Server shutting down")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-session audio pipeline statistics."""
+        stats = {
+            "audio_format": self.upstream_format,
+            "frames_received": getattr(self, "_audio_count", 0),
+            "packets_sent": self.packets_sent,
+            "preconnect_replayed_ms": round(self.preconnect_replayed_ms),
+            "preconnect_dropped_bytes": self.preconnect_dropped_bytes,
+            "audio_queue": self.audio_queue.stats(),
+            "upstream_reconnects": sum(s.reconnects for s in self.streams),
+            "duplicate_tokens": sum(s.duplicate_tokens for s in self.streams),
+        }
+        gates = [s.gate for s in self.streams if s.gate is not None]
+        if gates:
+            total = sum(g.total_bytes for g in gates)
+            suppressed = sum(g.suppressed_bytes for g in gates)
+            stats["vad_suppressed_fraction"] = round(suppressed / total, 3) if total else 0.0
+            stats["vad_openings"] = sum(g.openings for g in gates)
+        converters = [s.converter for s in self.streams if s.converter is not None]
+        if converters:
+            frames = sum(c.frames for c in converters)
+            busy = sum(c.busy_seconds for c in converters)
+            audio = sum(c.audio_seconds for c in converters)
+            stats["convert_us_per_packet"] = round(busy / frames * 1e6, 1) if frames else 0.0
+            stats["convert_cpu_percent"] = round(busy / audio * 100, 3) if audio else 0.0
+            stats["convert_delay_ms"] = round(converters[0].delay_ms, 2)
+        if INTERIM_RESULTS:
+            stats["interim_sent"] = sum(s.interim.sent for s in self.streams)
+            stats["interim_suppressed"] = sum(s.interim.suppressed for s in self.streams)
+        return stats
+
+    async def close_stream(self, stream: SonioxStream):
+        """Close a single Soniox connection."""
+        if stream.ws:
             try:
-                await self.soniox_ws.close()
+                await stream.ws.close()
             except:
                 pass
 
+    async def close(self):
+        """Clean up connections."""
+        self.running = False
+        self.audio_queue.close()
+        for task in (self.connect_task, self.forward_task):
+            if task is not None and not task.done():
+                task.cancel()
+        for stream in self.streams:
+            await self.close_stream(stream)
+
 
 async def websocket_handler(request):
     """Handle incoming WebSocket connection from Vapi."""
+    if request.app[DRAIN_KEY].draining:
+        # Refuse before upgrading so Vapi can place the call on another node
+        SESSIONS_REJECTED.inc("draining")
+        return web.json_response({"error": "Server is shutting down"}, status=503,
+                                 headers={"Retry-After": "1"})
+
+    reason = request.app[ADMISSION_KEY].check(len(request.app[SESSIONS_KEY]))
+    if reason is not None:
+        # Over capacity - shed the call before any upgrade or upstream work
+        SESSIONS_REJECTED.inc(reason)
+        logger.warning("🚦 Refusing Vapi connection: %s", reason, extra={"event": "session_rejected"})
+        return web.json_response({"error": "Server at capacity", "reason": reason}, status=503,
+                                 headers={"Retry-After": "1"})
+
     ws = web.WebSocketResponse()
     await ws.prepare(request)
 
-    print("\n" + "=" * 60)
-    print("📞 New Vapi connection received")
-    print("=" * 60)
-
     # Get API key from environment
     api_key = os.environ.get("SONIOX_API_KEY")
     if not api_key:
@@ -223,7 +1043,11 @@ async def websocket_handler(request):
         return ws
 
     # Create transcription session
-    session = VapiTranscriberSession(ws, api_key)
+    session = VapiTranscriberSession(ws, api_key, pool=request.app.get(SONIOX_POOL_KEY))
+    session.log.info("📞 New Vapi connection received", extra={"event": "session_started"})
+    sessions = request.app[SESSIONS_KEY]
+    sessions.add(session)
+    ACTIVE_SESSIONS.inc()
 
     try:
         # Process messages from Vapi
@@ -233,45 +1057,189 @@ async def websocket_handler(request):
             elif msg.type == web.WSMsgType.BINARY:
                 await session.handle_vapi_message(msg.data)
             elif msg.type == web.WSMsgType.ERROR:
-                print(f"⚠️  WebSocket error: {ws.exception()}")
+                ERRORS.inc("vapi_websocket")
+                session.log.warning("⚠️  WebSocket error: %s", ws.exception(),
+                                    extra={"event": "vapi_websocket_error"})
                 break
             elif msg.type == web.WSMsgType.CLOSE:
-                print("📪 Vapi closed connection")
+                session.log.info("📪 Vapi closed connection", extra={"event": "vapi_closed"})
                 break
 
-        # Wait for Soniox handler to finish (if it was started)
-        if hasattr(session, 'soniox_task'):
-            await session.soniox_task
+        # Wait for Soniox handlers to finish (if they were started)
+        await session.wait_for_streams()
 
     except Exception as e:
-        print(f"❌ Error in websocket handler: {e}")
+        ERRORS.inc("handler")
+        session.log.error("❌ Error in websocket handler: %s", e, extra={"event": "handler_error"})
     finally:
+        sessions.discard(session)
+        ACTIVE_SESSIONS.dec()
         await session.close()
-        print("=" * 60)
-        print("Session ended")
-        print("=" * 60 + "\n")
+        QUEUE_DROPPED_FRAMES.inc(session.audio_queue.dropped_frames)
+        QUEUE_HIGH_WATER.observe(session.audio_queue.high_water)
+        AUDIO_SUPPRESSED_BYTES.inc(sum(s.gate.suppressed_bytes for s in session.streams if s.gate is not None))
+        stats = session.stats()
+        session.log.info("📊 Session ended", extra={"event": "session_ended", "stats": stats})
+        if session.recorder is not None:
+            session.recorder.close(stats)
 
     return ws
 
 
 async def health_check(request):
     """Health check endpoint."""
-    return web.Response(text="OK", status=200)
+    drain = request.app[DRAIN_KEY]
+    health = {
+        "status": "draining" if drain.draining else "ok",
+        "worker": {
+            "index": request.app[WORKER_INDEX_KEY],
+            "pid": os.getpid(),
+        },
+        "sessions": len(request.app[SESSIONS_KEY]),
+    }
+
+    pool = request.app.get(SONIOX_POOL_KEY)
+    if pool is not None:
+        health["soniox_pool"] = pool.stats()
+
+    if drain.draining:
+        # 503 takes the node out of load balancer rotation
+        health["draining_for"] = round(drain.elapsed(), 1)
+        return web.json_response(health, status=503)
+    return web.json_response(health, status=200)
+
+
+async def ready_check(request):
+    """Readiness endpoint: remaining capacity, for load balancer weighting."""
+    drain = request.app[DRAIN_KEY]
+    admission = request.app[ADMISSION_KEY]
+    active = len(request.app[SESSIONS_KEY])
+
+    reason = "draining" if drain.draining else admission.check(active)
+    ready = {
+        "ready": reason is None,
+        "reason": reason,
+        "worker": request.app[WORKER_INDEX_KEY],
+        **admission.capacity(active),
+    }
+    if reason is not None:
+        ready["weight"] = 0
+
+    return web.json_response(ready, status=200 if reason is None else 503,
+                             headers={"X-Capacity-Weight": str(ready["weight"])})
+
+
+async def metrics_handler(request):
+    """Prometheus metrics endpoint."""
+    body = METRICS.render()
+
+    pool = request.app.get(SONIOX_POOL_KEY)
+    if pool is not None:
+        stats = pool.stats()
+        body += (
+            "# HELP soniox_vapi_pool_checkouts_total Soniox pool checkouts by result\n"
+            "# TYPE soniox_vapi_pool_checkouts_total counter\n"
+            f'soniox_vapi_pool_checkouts_total{{result="hit"}} {stats["hits"]}\n'
+            f'soniox_vapi_pool_checkouts_total{{result="miss"}} {stats["misses"]}\n'
+            "# HELP soniox_vapi_pool_idle_connections Warm Soniox connections in the pool\n"
+            "# TYPE soniox_vapi_pool_idle_connections gauge\n"
+            f'soniox_vapi_pool_idle_connections {stats["idle"]}\n'
+        )
+
+    return web.Response(text=body, content_type="text/plain", charset="utf-8",
+                        headers={"X-Worker-Index": str(request.app[WORKER_INDEX_KEY])})
+
 
+async def soniox_pool_ctx(app):
+    """Open the Soniox connection pool for the lifetime of the app."""
+    pool = None
+    if POOL_SIZE > 0:
+        pool = SonioxConnectionPool(
+            SONIOX_WEBSOCKET_URL,
+            size=POOL_SIZE,
+            max_idle_age=POOL_MAX_IDLE_AGE,
+            refill_rate=POOL_REFILL_RATE,
+        )
+        await pool.start()
+    app[SONIOX_POOL_KEY] = pool
 
-def create_app():
+    yield
+
+    if pool is not None:
+        await pool.close()
+
+
+async def drain_sessions(app: web.Application):
+    """Refuse new calls and let live ones finish, for up to DRAIN_TIMEOUT seconds."""
+    app[DRAIN_KEY].start()
+    sessions = app[SESSIONS_KEY]
+    logger.info("🚰 Draining: refusing new calls, waiting up to %gs for %d live call(s)",
+                DRAIN_TIMEOUT, len(sessions), extra={"event": "drain_started"})
+
+    deadline = time.monotonic() + DRAIN_TIMEOUT
+    while sessions and time.monotonic() < deadline:
+        await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+    if sessions:
+        logger.warning("⏱️  Drain deadline reached, ending %d call(s)", len(sessions),
+                       extra={"event": "drain_timeout"})
+        await asyncio.gather(*(session.end() for session in list(sessions)), return_exceptions=True)
+
+    logger.info("✅ Drain complete", extra={"event": "drain_complete"})
+
+
+async def admission_ctx(app):
+    """Run the load monitor behind admission control for the lifetime of the app."""
+    monitor = app[ADMISSION_KEY].monitor
+    await monitor.start()
+    LOOP_LAG_SECONDS.callback = lambda: monitor.lag
+    INBOUND_BITRATE.callback = lambda: monitor.inbound_kbps
+
+    yield
+
+    await monitor.close()
+
+
+def create_app(worker_index: int = 0):
     """Create and configure the aiohttp application."""
     app = web.Application()
+    app[WORKER_INDEX_KEY] = worker_index
+    app[SESSIONS_KEY] = set()
+    app[DRAIN_KEY] = DrainState()
+    app[ADMISSION_KEY] = AdmissionController(
+        LoadMonitor(lambda: AUDIO_BYTES_IN.value),
+        max_sessions=MAX_SESSIONS,
+        max_inbound_kbps=MAX_INBOUND_KBPS,
+        max_loop_lag_ms=MAX_LOOP_LAG_MS,
+    )
+    app.cleanup_ctx.append(soniox_pool_ctx)
+    app.cleanup_ctx.append(admission_ctx)
 
     # Add routes
     app.router.add_get("/api/custom-transcriber", websocket_handler)
     app.router.add_get("/health", health_check)
+    app.router.add_get("/ready", ready_check)
+    app.router.add_get("/metrics", metrics_handler)
 
     return app
 
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Soniox custom transcriber server for Vapi")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("VAPI_SERVER_WORKERS", "1")),
+        help="number of worker processes sharing the port (default: 1)",
+    )
+    return parser.parse_args()
+
+
 def main():
     """Run the Vapi custom transcriber server."""
+    args = parse_args()
+
     # Check for API key
     api_key = os.environ.get("SONIOX_API_KEY")
     if not api_key:
@@ -282,25 +1250,60 @@ def main():
         print("\nGet your API key from: https://console.soniox.com")
         sys.exit(1)
 
+    if AUDIO_QUEUE_POLICY not in OVERFLOW_POLICIES:
+        print(f"\n❌ Error: invalid VAPI_AUDIO_QUEUE_POLICY '{AUDIO_QUEUE_POLICY}'")
+        print(f"Choose one of: {', '.join(OVERFLOW_POLICIES)}")
+        sys.exit(1)
+
     # Get configuration
     host = os.environ.get("VAPI_SERVER_HOST", "0.0.0.0")
     port = int(os.environ.get("VAPI_SERVER_PORT", "8080"))
 
-    print("\n" + "=" * 60)
-    print("🚀 SONIOX VAPI CUSTOM TRANSCRIBER SERVER")
-    print("=" * 60)
-    print(f"\n📡 Server starting on {host}:{port}")
-    print(f"🔗 WebSocket endpoint: ws://{host}:{port}/api/custom-transcriber")
-    print(f"💚 Health check: http://{host}:{port}/health")
-    print("\n📝 To use with Vapi:")
-    print("   1. Expose this server with ngrok: ngrok http 8080")
-    print("   2. Use the ngrok URL in your Vapi transcriber config")
-    print("\n✅ Server ready - waiting for connections...")
-    print("=" * 60 + "\n")
-
-    # Create and run app
-    app = create_app()
-    web.run_app(app, host=host, port=port, print=None)
+    setup_logging()
+
+    if json_logging_enabled():
+        logger.info("🚀 Soniox Vapi transcriber server starting", extra={
+            "event": "server_starting",
+            "host": host,
+            "port": port,
+            "workers": args.workers,
+            "channel_mode": CHANNEL_MODE,
+            "audio_queue": f"{AUDIO_QUEUE_FRAMES}/{AUDIO_QUEUE_POLICY}",
+            "packet_ms": PACKET_MS,
+            "pool_size": POOL_SIZE,
+        })
+    else:
+        print("\n" + "=" * 60)
+        print("🚀 SONIOX VAPI CUSTOM TRANSCRIBER SERVER")
+        print("=" * 60)
+        print(f"\n📡 Server starting on {host}:{port}"
+              + (f" with {args.workers} workers" if args.workers > 1 else ""))
+        print(f"🔗 WebSocket endpoint: ws://{host}:{port}/api/custom-transcriber")
+        print(f"💚 Health check: http://{host}:{port}/health (capacity: /ready)")
+        print(f"📈 Metrics: http://{host}:{port}/metrics")
+        print(f"🔀 Channel mode: {CHANNEL_MODE}"
+              + (f" ({', '.join(CHANNEL_ROLES)})" if CHANNEL_MODE == "split" else ""))
+        print(f"📦 Audio queue: {AUDIO_QUEUE_FRAMES} frames ({AUDIO_QUEUE_POLICY}), "
+              f"upstream packets: {f'{PACKET_MS} ms' if PACKET_MS > 0 else 'as received'}")
+        if POOL_SIZE > 0:
+            print(f"♻️  Soniox connection pool: {POOL_SIZE} warm connections "
+                  f"(max idle {POOL_MAX_IDLE_AGE:g}s, refill {POOL_REFILL_RATE:g}/s)")
+        print("\n📝 To use with Vapi:")
+        print("   1. Expose this server with ngrok: ngrok http 8080")
+        print("   2. Use the ngrok URL in your Vapi transcriber config")
+        print("\n✅ Server ready - waiting for connections...")
+        print("=" * 60 + "\n")
+
+    if args.workers > 1:
+        # Supervisor forks the workers; each one builds its own app and pool
+        # Give workers time to drain before the supervisor kills them
+        WorkerSupervisor(create_app, host, port, args.workers,
+                         shutdown_timeout=DRAIN_TIMEOUT + FINISH_TIMEOUT + 5,
+                         drain=drain_sessions).run()
+    else:
+        # Create and run app
+        app = create_app()
+        run_app(app, host=host, port=port, drain=drain_sessions)
 
 
 if __name__ == "__main__":
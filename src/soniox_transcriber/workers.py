@@ -0,0 +1,166 @@
+"""
+Multi-process worker mode for the Vapi server
+Forks N aiohttp workers sharing one port and restarts any that die.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Callable, List, Optional
+
+from aiohttp import web
+
+from soniox_transcriber.lifecycle import DrainCallback, run_app
+from soniox_transcriber.log import get_logger, setup_logging, stop_logging
+
+logger = get_logger("soniox_transcriber.workers")
+
+# Minimum delay between restarts of the same worker slot
+RESTART_BACKOFF = 1.0
+SUPERVISOR_POLL_INTERVAL = 0.5
+
+
+def create_listen_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    """Create a bound, listening TCP socket for a worker."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(
+    app_factory: Callable[[int], web.Application],
+    index: int,
+    sock: socket.socket,
+    drain: Optional[DrainCallback] = None,
+):
+    """Worker process entry point: serve the app on the inherited socket."""
+    # Ctrl+C reaches the whole process group, but only the supervisor acts on
+    # it: its SIGTERM starts the drain, and a stray SIGINT would count as the
+    # second signal and cut the drain short
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    # The supervisor's log listener thread does not survive fork
+    setup_logging()
+    try:
+        logger.info("👷 Worker %d started (pid %d)", index, os.getpid(), extra={"event": "worker_started"})
+        run_app(app_factory(index), sock=sock, drain=drain, signals=(signal.SIGTERM,))
+    finally:
+        # multiprocessing ends the child with os._exit(), so atexit never flushes the queue
+        stop_logging()
+
+
+class WorkerSupervisor:
+    """Fork, watch and restart aiohttp worker processes.
+
+    On Linux every worker gets its own SO_REUSEPORT socket so the kernel
+    balances new connections across workers. Elsewhere (macOS and the BSDs
+    accept SO_REUSEPORT but hand every connection to one listener) a single
+    pre-bound socket is shared by all workers, which take turns accepting.
+    """
+
+    def __init__(
+        self,
+        app_factory: Callable[[int], web.Application],
+        host: str,
+        port: int,
+        workers: int,
+        shutdown_timeout: float = 30.0,
+        drain: Optional[DrainCallback] = None,
+    ):
+        self.app_factory = app_factory
+        self.drain = drain
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.shutdown_timeout = shutdown_timeout
+        self.reuse_port = sys.platform.startswith("linux") and hasattr(socket, "SO_REUSEPORT")
+        self._ctx = multiprocessing.get_context("fork")
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._started_at: List[float] = [0.0] * workers
+        self._shared_sock: Optional[socket.socket] = None
+        self._stopping = False
+
+    def run(self):
+        """Start all workers and supervise them until SIGINT/SIGTERM."""
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        if not self.reuse_port:
+            self._shared_sock = create_listen_socket(self.host, self.port, reuse_port=False)
+        logger.info("👷 Starting %d workers on %s", self.workers,
+                    "per-worker SO_REUSEPORT sockets" if self.reuse_port else "one shared socket",
+                    extra={"event": "workers_starting"})
+
+        try:
+            for index in range(self.workers):
+                self._start_worker(index)
+
+            while not self._stopping:
+                time.sleep(SUPERVISOR_POLL_INTERVAL)
+                self._restart_dead_workers()
+        finally:
+            self._stop_workers()
+            if self._shared_sock is not None:
+                self._shared_sock.close()
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def _start_worker(self, index: int):
+        if self.reuse_port:
+            sock = create_listen_socket(self.host, self.port, reuse_port=True)
+        else:
+            sock = self._shared_sock
+
+        process = self._ctx.Process(
+            target=run_worker,
+            args=(self.app_factory, index, sock, self.drain),
+            name=f"soniox-vapi-worker-{index}",
+        )
+        process.start()
+
+        if self.reuse_port:
+            # The worker owns its socket now; keeping it open here would leave
+            # a listener nobody accepts on once that worker dies
+            sock.close()
+
+        self._processes[index] = process
+        self._started_at[index] = time.monotonic()
+
+    def _restart_dead_workers(self):
+        for index, process in enumerate(self._processes):
+            if process is None or process.is_alive() or self._stopping:
+                continue
+
+            logger.warning("⚠️  Worker %d (pid %d) exited with code %s, restarting",
+                           index, process.pid, process.exitcode, extra={"event": "worker_restarted"})
+            process.close()
+            self._processes[index] = None
+
+            wait = self._started_at[index] + RESTART_BACKOFF - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._start_worker(index)
+
+    def _stop_workers(self):
+        alive = [p for p in self._processes if p is not None and p.is_alive()]
+        for process in alive:
+            process.terminate()  # SIGTERM - the worker drains its calls, then exits
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in alive:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("⚠️  Worker pid %d did not stop in time, killing", process.pid,
+                               extra={"event": "worker_killed"})
+                process.kill()
+                process.join()
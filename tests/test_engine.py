@@ -0,0 +1,55 @@
+"""
+How a console session ends when its audio source fails
+Runs TranscriptionEngine against a local Soniox stub that never answers, so
+only the engine itself can end the session.
+"""
+import asyncio
+import time
+import unittest
+
+from websockets.asyncio.server import serve
+
+from soniox_transcriber import engine
+from soniox_transcriber.sources import AudioSource
+
+
+class FailingSource(AudioSource):
+    """Yields one chunk of audio, then fails like an unplugged device or a truncated pipe."""
+
+    async def frames(self):
+        yield b"\x00\x00" * 1600
+        await asyncio.sleep(0.05)
+        raise OSError("audio device unplugged")
+
+
+class SilentSoniox:
+    """Soniox stand-in that records what it receives and never responds."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handler(self, ws):
+        async for message in ws:
+            self.messages.append(message)
+
+
+class SourceErrorTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_source_error_ends_session_at_once(self):
+        soniox = SilentSoniox()
+        async with serve(soniox.handler, "127.0.0.1", 0) as server:
+            session = engine.TranscriptionEngine(
+                {"model": "stt-rt-preview"}, FailingSource(), lambda res: False,
+                url=f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}",
+            )
+            started = time.monotonic()
+            with self.assertRaisesRegex(OSError, "unplugged"):
+                await asyncio.wait_for(session.run(), timeout=5)
+            self.assertLess(time.monotonic() - started, 2)
+
+        self.assertEqual(session.audio_bytes, 3200)
+        self.assertEqual(soniox.messages[-1], "")  # End of audio was sent before giving up
+
+
+if __name__ == "__main__":
+    unittest.main()
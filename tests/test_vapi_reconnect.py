@@ -0,0 +1,120 @@
+"""
+When the Vapi server reopens a Soniox connection
+Runs the server app against a local Soniox stub and counts the upstream
+connections a call opens.
+"""
+import asyncio
+import json
+import os
+import socket
+import unittest
+
+import aiohttp
+from aiohttp import web
+from websockets.asyncio.server import serve
+
+from soniox_transcriber import vapi_server
+
+FRAME = b"\x01\x00" * 320  # 20 ms of 16 kHz mono pcm_s16le
+
+
+class SonioxStub:
+    """Soniox stand-in: `behavior` decides what each connection does."""
+
+    def __init__(self, behavior):
+        self.behavior = behavior
+        self.connections = 0
+
+    async def handler(self, ws):
+        self.connections += 1
+        await ws.recv()  # Config
+        await self.behavior(ws, self.connections)
+
+
+class ReconnectTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        os.environ.setdefault("SONIOX_API_KEY", "test")
+        self.saved = {name: getattr(vapi_server, name)
+                      for name in ("SONIOX_WEBSOCKET_URL", "POOL_SIZE", "RECONNECT_BACKOFF_MS")}
+        vapi_server.POOL_SIZE = 0
+        vapi_server.RECONNECT_BACKOFF_MS = 10
+
+        self.app = vapi_server.create_app()
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}/api/custom-transcriber"
+        await web.SockSite(self.runner, sock).start()
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+        for name, value in self.saved.items():
+            setattr(vapi_server, name, value)
+
+    async def call(self, behavior, seconds: float = 0.4) -> SonioxStub:
+        """Stream one call for `seconds`, hang up, wait for the session to end; returns the stub."""
+        stub = SonioxStub(behavior)
+        async with serve(stub.handler, "127.0.0.1", 0) as server:
+            vapi_server.SONIOX_WEBSOCKET_URL = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            async with aiohttp.ClientSession() as http:
+                async with http.ws_connect(self.url) as ws:
+                    await ws.send_str(json.dumps({"type": "start", "encoding": "linear16", "container": "raw",
+                                                  "sampleRate": 16000, "channels": 1}))
+                    for _ in range(int(seconds / 0.02)):
+                        await ws.send_bytes(FRAME)
+                        await asyncio.sleep(0.02)
+            for _ in range(200):
+                if not self.app[vapi_server.SESSIONS_KEY]:
+                    break
+                await asyncio.sleep(0.02)
+            self.assertFalse(self.app[vapi_server.SESSIONS_KEY], "session did not end")
+        return stub
+
+    async def test_error_response_is_not_retried(self):
+        async def reject(ws, connection):
+            await ws.send(json.dumps({"tokens": [], "error_code": 401, "error_message": "Invalid API key"}))
+            await ws.close(1011, "invalid api key")
+
+        stub = await self.call(reject)
+        self.assertEqual(stub.connections, 1)
+
+    async def test_close_after_call_ended_is_not_reconnected(self):
+        async def close_on_end_of_audio(ws, connection):
+            async for message in ws:
+                if message == "":
+                    await ws.close()  # Normal close, without a finished response
+                    return
+
+        stub = await self.call(close_on_end_of_audio)
+        self.assertEqual(stub.connections, 1)
+
+    async def test_abnormal_close_after_call_ended_is_not_reconnected(self):
+        async def drop_on_end_of_audio(ws, connection):
+            async for message in ws:
+                if message == "":
+                    await ws.close(1011, "internal error")
+                    return
+
+        stub = await self.call(drop_on_end_of_audio)
+        self.assertEqual(stub.connections, 1)
+
+    async def test_drop_mid_call_reconnects(self):
+        async def drop_first(ws, connection):
+            frames = 0
+            async for message in ws:
+                frames += 1
+                if connection == 1 and frames == 3:
+                    await ws.close(1011, "internal error")
+                    return
+                if message == "":
+                    await ws.send(json.dumps({"tokens": [], "finished": True}))
+                    return
+
+        stub = await self.call(drop_first)
+        self.assertEqual(stub.connections, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
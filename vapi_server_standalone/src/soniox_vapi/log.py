@@ -0,0 +1,224 @@
+"""
+Structured, non-blocking logging for the Vapi server
+Records are filtered (sampling + rate limiting) on the event loop thread and
+handed to a QueueListener. Only the message itself (msg % args, plus any
+traceback) is rendered on the calling thread, so arguments are captured as
+they were; the formatter and stdout writes run on the listener's thread.
+
+Environment:
+    VAPI_LOG_LEVEL       Minimum level for this package (default: INFO)
+    VAPI_LOG_FORMAT      "text" (default) or "json" (one object per line)
+    VAPI_LOG_SAMPLE      Per-event sampling, e.g. "audio_progress=0.1,soniox_response=0.01"
+    VAPI_LOG_RATE_LIMIT  Per-event max records/second, e.g. "transcript_sent=50"
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Any, Dict, Optional
+
+# Defaults keep the noisiest hot-path events in check out of the box
+DEFAULT_SAMPLE: Dict[str, float] = {}
+DEFAULT_RATE_LIMIT = {
+    "transcript_sent": 50.0,
+    "soniox_response": 20.0,
+    "soniox_send_error": 5.0,
+    "audio_before_connect": 1.0,
+}
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Top-level package whose loggers VAPI_LOG_LEVEL applies to
+PACKAGE = __name__.split(".")[0]
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+def _parse_event_map(value: Optional[str]) -> Dict[str, float]:
+    """Parse "event=number,event=number" settings."""
+    result = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            event, number = item.split("=", 1)
+            result[event.strip()] = float(number)
+    return result
+
+
+def _record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS}
+
+
+class EventRateFilter(logging.Filter):
+    """Per-event sampling and token-bucket rate limiting.
+
+    Records carry their event type in ``record.event``. Sampling is
+    deterministic (every Nth record for rate 1/N). Records dropped by the rate
+    limit are counted and reported as ``suppressed`` on the next one let through.
+    """
+
+    def __init__(self, sample: Dict[str, float], rate_limit: Dict[str, float]):
+        super().__init__()
+        self.sample_every = {
+            event: (int(round(1 / rate)) if rate > 0 else 0) for event, rate in sample.items()
+        }
+        self.rate_limit = rate_limit
+        self._seen: Dict[str, int] = {}
+        self._tokens: Dict[str, float] = {}
+        self._refilled_at: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if event is None:
+            return True
+
+        every = self.sample_every.get(event)
+        if every is not None:
+            if every == 0:
+                return False
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+            if seen % every:
+                return False
+
+        limit = self.rate_limit.get(event)
+        if limit is not None:
+            now = time.monotonic()
+            tokens = self._tokens.get(event, limit)
+            tokens = min(limit, tokens + (now - self._refilled_at.get(event, now)) * limit)
+            self._refilled_at[event] = now
+            if tokens < 1:
+                self._tokens[event] = tokens
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                return False
+            self._tokens[event] = tokens - 1
+
+            suppressed = self._suppressed.pop(event, 0)
+            if suppressed:
+                record.suppressed = suppressed
+
+        return True
+
+
+class SnapshotQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that snapshots non-primitive extra fields before enqueueing.
+
+    QueueHandler.prepare() already renders the message on the calling thread,
+    but the formatter runs later on the listener's thread, by which time
+    objects passed in `extra` (sockets, weak proxies) may have changed or died.
+    """
+
+    _PRIMITIVES = (str, int, float, bool, type(None), dict, list, tuple)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        for key, value in _record_fields(record).items():
+            if not isinstance(value, self._PRIMITIVES):
+                setattr(record, key, str(value))
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with context fields appended as key=value."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _record_fields(record)
+        fields.pop("event", None)
+        if fields:
+            line += "  " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_record_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ContextLogger(logging.LoggerAdapter):
+    """Logger adapter that merges bound context (e.g. session id) into every record."""
+
+    def process(self, msg, kwargs):
+        extra = dict(self.extra)
+        if kwargs.get("extra"):
+            extra.update(kwargs["extra"])
+        kwargs["extra"] = extra
+        return msg, kwargs
+
+    def bind(self, **context) -> "ContextLogger":
+        """Return a child logger with additional context."""
+        return ContextLogger(self.logger, {**self.extra, **context})
+
+
+def get_logger(name: str, **context) -> ContextLogger:
+    """Return a context-aware logger."""
+    return ContextLogger(logging.getLogger(name), context)
+
+
+def json_logging_enabled() -> bool:
+    return os.environ.get("VAPI_LOG_FORMAT", "text").lower() == "json"
+
+
+def setup_logging():
+    """Route all logging through a background QueueListener.
+
+    Safe to call again in a forked worker: the listener thread does not
+    survive fork, so each process starts its own.
+    """
+    global _listener, _listener_pid
+
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    elif _listener is None:
+        atexit.register(stop_logging)
+
+    formatter: logging.Formatter
+    if json_logging_enabled():
+        formatter = JsonFormatter()
+    else:
+        formatter = TextFormatter("%(asctime)s %(levelname)s %(message)s", "%H:%M:%S")
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(formatter)
+
+    sample = {**DEFAULT_SAMPLE, **_parse_event_map(os.environ.get("VAPI_LOG_SAMPLE"))}
+    rate_limit = {**DEFAULT_RATE_LIMIT, **_parse_event_map(os.environ.get("VAPI_LOG_RATE_LIMIT"))}
+
+    queue_handler = SnapshotQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(EventRateFilter(sample, rate_limit))
+
+    # Third-party libraries (websockets frame traces, aiohttp access logs) only
+    # get through at WARNING; VAPI_LOG_LEVEL applies to this package
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(logging.WARNING)
+    logging.getLogger(PACKAGE).setLevel(os.environ.get("VAPI_LOG_LEVEL", "INFO").upper())
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+
+def stop_logging():
+    """Flush and stop the background listener."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
@@ -4,9 +4,9 @@ Vapi Custom Transcriber Server using Soniox
 WebSocket server that receives audio from Vapi and sends back Soniox transcriptions
 """
 import asyncio
-import json
 import os
 import sys
+import uuid
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
@@ -14,11 +14,16 @@ from aiohttp import web
 import websockets
 from websockets.asyncio.client import connect as ws_connect
 
+from soniox_vapi import codec
+from soniox_vapi.log import get_logger, json_logging_enabled, setup_logging
+
 # Load environment variables
 load_dotenv()
 
 SONIOX_WEBSOCKET_URL = "wss://stt-rt.soniox.com/transcribe-websocket"
 
+logger = get_logger("soniox_vapi.server")
+
 
 class VapiTranscriberSession:
     """Manages a single Vapi transcription session."""
@@ -26,6 +31,8 @@ class VapiTranscriberSession:
     def __init__(self, vapi_ws, api_key: str):
         self.vapi_ws = vapi_ws
         self.api_key = api_key
+        self.session_id = uuid.uuid4().hex[:12]
+        self.log = logger.bind(session=self.session_id)
         self.soniox_ws: Optional[Any] = None
         self.audio_config: Optional[Dict] = None
         self.running = True
@@ -50,9 +57,10 @@ class VapiTranscriberSession:
         try:
             self.soniox_ws = await ws_connect(SONIOX_WEBSOCKET_URL)
             config = self.get_soniox_config()
-            await self.soniox_ws.send(json.dumps(config))
-            print(
-                f"✅ Connected to Soniox (sample_rate={config['sample_rate']}, channels={config['num_channels']})")
+            await self.soniox_ws.send(codec.dumps(config))
+            self.log.info("✅ Connected to Soniox (sample_rate=%s, channels=%s)",
+                          config["sample_rate"], config["num_channels"],
+                          extra={"event": "soniox_connected"})
 
             # Start the response handler task NOW that we're connected
             self.soniox_task = asyncio.create_task(
@@ -60,7 +68,7 @@ class VapiTranscriberSession:
 
             return True
         except Exception as e:
-            print(f"❌ Error connecting to Soniox: {e}")
+            self.log.error("❌ Error connecting to Soniox: %s", e, extra={"event": "soniox_connect_error"})
             return False
 
     async def handle_vapi_message(self, message):
@@ -68,7 +76,7 @@ class VapiTranscriberSession:
         # Handle text messages (JSON)
         if isinstance(message, str):
             try:
-                data = json.loads(message)
+                data = codec.loads(message)
                 msg_type = data.get("type")
 
                 if msg_type == "start":
@@ -79,17 +87,19 @@ class VapiTranscriberSession:
                         "sampleRate": data.get("sampleRate", 16000),
                         "channels": data.get("channels", 2),
                     }
-                    print(
-                        f"📥 Received Vapi start message: {self.audio_config}")
+                    self.log.info("📥 Received Vapi start message: %s", self.audio_config,
+                                  extra={"event": "vapi_start"})
 
                     # Connect to Soniox with the audio config
                     await self.connect_to_soniox()
 
                 else:
-                    print(f"⚠️  Unknown message type from Vapi: {msg_type}")
+                    self.log.warning("⚠️  Unknown message type from Vapi: %s", msg_type,
+                                     extra={"event": "vapi_unknown_message"})
 
-            except json.JSONDecodeError:
-                print(f"⚠️  Invalid JSON from Vapi: {message}")
+            except codec.DecodeError:
+                self.log.warning("⚠️  Invalid JSON from Vapi: %s", message,
+                                 extra={"event": "vapi_invalid_json"})
 
         # Handle binary messages (audio data)
         elif isinstance(message, bytes):
@@ -99,24 +109,26 @@ class VapiTranscriberSession:
             self._audio_count += 1
 
             if self._audio_count % 100 == 0:  # Log every 100 chunks
-                print(
-                    f"🎵 Received {self._audio_count} audio chunks ({len(message)} bytes)")
+                self.log.debug("🎵 Received %d audio chunks (%d bytes)", self._audio_count, len(message),
+                               extra={"event": "audio_progress"})
 
             if self.soniox_ws:
                 try:
                     # Forward audio to Soniox
                     await self.soniox_ws.send(message)
                 except Exception as e:
-                    print(f"⚠️  Error sending audio to Soniox: {e}")
+                    self.log.warning("⚠️  Error sending audio to Soniox: %s", e,
+                                     extra={"event": "soniox_send_error"})
             else:
-                print("⚠️  Received audio but Soniox not connected yet")
+                self.log.warning("⚠️  Received audio but Soniox not connected yet",
+                                 extra={"event": "audio_before_connect"})
 
     async def process_soniox_responses(self):
         """Read transcription results from Soniox and send to Vapi."""
         if not self.soniox_ws:
             return
 
-        print("🎧 Started listening for Soniox responses...")
+        self.log.debug("🎧 Started listening for Soniox responses...", extra={"event": "soniox_listening"})
 
         try:
             async for message in self.soniox_ws:
@@ -124,26 +136,26 @@ class VapiTranscriberSession:
                     break
 
                 try:
-                    res = json.loads(message)
+                    res = codec.decode_response(message)
 
                     # Debug: Log all Soniox responses
-                    # print(f"🔊 Soniox response: {res}")
+                    self.log.debug("🔊 Soniox response: %s", res, extra={"event": "soniox_response"})
 
                     # Check for errors from Soniox
-                    if res.get("error_code"):
-                        print(
-                            f"❌ Soniox error: {res['error_code']} - {res['error_message']}")
+                    if res.error_code:
+                        self.log.error("❌ Soniox error: %s - %s", res.error_code, res.error_message,
+                                       extra={"event": "soniox_error"})
                         continue
 
                     # Extract final transcription tokens with speaker info
                     final_tokens = []
                     speaker_id = None
-                    for token in res.get("tokens", []):
-                        if token.get("is_final") and token.get("text"):
-                            final_tokens.append(token["text"])
+                    for token in res.tokens:
+                        if token.is_final and token.text:
+                            final_tokens.append(token.text)
                             # Get speaker from token (Soniox diarization provides this)
-                            if speaker_id is None and "speaker" in token:
-                                speaker_id = token["speaker"]
+                            if speaker_id is None:
+                                speaker_id = token.speaker
 
                     # Send transcription to Vapi if we have final tokens
                     if final_tokens:
@@ -184,22 +196,25 @@ class VapiTranscriberSession:
                             "channel": vapi_channel,
                         }
 
-                        await self.vapi_ws.send_json(vapi_response)
-                        print(
-                            f"📤 Sent to Vapi [{vapi_channel}] (speaker: {speaker_id}): {transcription}")
+                        await self.vapi_ws.send_json(vapi_response, dumps=codec.dumps)
+                        self.log.info("📤 Sent to Vapi [%s] (speaker: %s): %s", vapi_channel, speaker_id, transcription,
+                                      extra={"event": "transcript_sent"})
 
                     # Check if session finished
-                    if res.get("finished"):
-                        print("✅ Soniox session finished")
+                    if res.finished:
+                        self.log.info("✅ Soniox session finished", extra={"event": "soniox_finished"})
                         break
 
-                except json.JSONDecodeError:
-                    print(f"⚠️  Invalid JSON from Soniox: {message}")
+                except codec.DecodeError:
+                    self.log.warning("⚠️  Invalid JSON from Soniox: %s", message,
+                                     extra={"event": "soniox_invalid_json"})
                 except Exception as e:
-                    print(f"⚠️  Error processing Soniox response: {e}")
+                    self.log.warning("⚠️  Error processing Soniox response: %s", e,
+                                     extra={"event": "soniox_response_error"})
 
         except Exception as e:
-            print(f"⚠️  Error in Soniox response handler: {e}")
+            self.log.warning("⚠️  Error in Soniox response handler: %s", e,
+                             extra={"event": "soniox_receive_error"})
 
     async def close(self):
         """Clean up connections."""
@@ -216,10 +231,6 @@ async def websocket_handler(request):
     ws = web.WebSocketResponse()
     await ws.prepare(request)
 
-    print("\n" + "=" * 60)
-    print("📞 New Vapi connection received")
-    print("=" * 60)
-
     # Get API key from environment
     api_key = os.environ.get("SONIOX_API_KEY")
     if not api_key:
@@ -231,6 +242,7 @@ async def websocket_handler(request):
 
     # Create transcription session
     session = VapiTranscriberSession(ws, api_key)
+    session.log.info("📞 New Vapi connection received", extra={"event": "session_started"})
 
     try:
         # Process messages from Vapi
@@ -240,10 +252,11 @@ async def websocket_handler(request):
             elif msg.type == web.WSMsgType.BINARY:
                 await session.handle_vapi_message(msg.data)
             elif msg.type == web.WSMsgType.ERROR:
-                print(f"⚠️  WebSocket error: {ws.exception()}")
+                session.log.warning("⚠️  WebSocket error: %s", ws.exception(),
+                                    extra={"event": "vapi_websocket_error"})
                 break
             elif msg.type == web.WSMsgType.CLOSE:
-                print("📪 Vapi closed connection")
+                session.log.info("📪 Vapi closed connection", extra={"event": "vapi_closed"})
                 break
 
         # Wait for Soniox handler to finish (if it was started)
@@ -251,12 +264,10 @@ async def websocket_handler(request):
             await session.soniox_task
 
     except Exception as e:
-        print(f"❌ Error in websocket handler: {e}")
+        session.log.error("❌ Error in websocket handler: %s", e, extra={"event": "handler_error"})
     finally:
         await session.close()
-        print("=" * 60)
-        print("Session ended")
-        print("=" * 60 + "\n")
+        session.log.info("Session ended", extra={"event": "session_ended"})
 
     return ws
 
@@ -293,17 +304,23 @@ def main():
     host = os.environ.get("VAPI_SERVER_HOST", "0.0.0.0")
     port = int(os.environ.get("VAPI_SERVER_PORT", "8080"))
 
-    print("\n" + "=" * 60)
-    print("🚀 SONIOX VAPI CUSTOM TRANSCRIBER SERVER")
-    print("=" * 60)
-    print(f"\n📡 Server starting on {host}:{port}")
-    print(f"🔗 WebSocket endpoint: ws://{host}:{port}/api/custom-transcriber")
-    print(f"💚 Health check: http://{host}:{port}/health")
-    print("\n📝 To use with Vapi:")
-    print("   1. Expose this server with ngrok: ngrok http 8080")
-    print("   2. Use the ngrok URL in your Vapi transcriber config")
-    print("\n✅ Server ready - waiting for connections...")
-    print("=" * 60 + "\n")
+    setup_logging()
+
+    if json_logging_enabled():
+        logger.info("🚀 Soniox Vapi transcriber server starting",
+                    extra={"event": "server_starting", "host": host, "port": port})
+    else:
+        print("\n" + "=" * 60)
+        print("🚀 SONIOX VAPI CUSTOM TRANSCRIBER SERVER")
+        print("=" * 60)
+        print(f"\n📡 Server starting on {host}:{port}")
+        print(f"🔗 WebSocket endpoint: ws://{host}:{port}/api/custom-transcriber")
+        print(f"💚 Health check: http://{host}:{port}/health")
+        print("\n📝 To use with Vapi:")
+        print("   1. Expose this server with ngrok: ngrok http 8080")
+        print("   2. Use the ngrok URL in your Vapi transcriber config")
+        print("\n✅ Server ready - waiting for connections...")
+        print("=" * 60 + "\n")
 
     # Create and run app
     app = create_app()